@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Tuple
+from PyQt5.QtCore import QThread, pyqtSignal
+from blockchain.block import Block, Blockchain
+from blockchain.user import User
+from utils.keycache import KeyMaterial, key_cache
+
+
+def generate_demo_key(_: int = 0) -> Tuple[str, KeyMaterial]:
+    """
+    在子进程中生成一个用户的 wif 并导出密钥信息。
+
+    :return: (wif, 密钥信息)
+    """
+    wif = User.create_user()
+    return wif, key_cache.from_wif(wif)
+
+
+class DemoLoader(QThread):
+    """
+    在后台线程中生成演示用户与创世区块，界面不必等待。
+
+    密钥导出分发到多个进程并行进行，结果放入主进程的密钥缓存，之后创建 User 不再做椭圆曲线运算。
+    子进程以 spawn 方式启动：在 Qt 的多线程进程中 fork 可能复制处于加锁状态的锁。
+    每生成一个用户发出 user_ready 与 progress；前两个用户生成后，分别作为矿工挖出前两个区块，发出 chain_ready。
+    """
+    user_ready = pyqtSignal(object)
+    progress = pyqtSignal(int, int)
+    chain_ready = pyqtSignal(object)
+
+    def __init__(self, count: int = 10, workers: int = None) -> None:
+        """
+        :param count: 演示用户数
+        :param workers: 进程数，默认为 CPU 核数
+        """
+        super().__init__()
+        self.count = count
+        self.workers = workers or os.cpu_count() or 1
+
+    def run(self) -> None:
+        miners = []
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(min(self.workers, self.count), mp_context=context) as pool:
+            pending = [pool.submit(generate_demo_key) for _ in range(self.count)]
+            for done, future in enumerate(as_completed(pending), 1):
+                wif, material = future.result()
+                key_cache.put(material)
+                user = User(wif)
+                self.user_ready.emit(user)
+                self.progress.emit(done, self.count)
+                if len(miners) < 2:
+                    miners.append(user)
+                    if len(miners) == 2:
+                        blockchain = Blockchain()
+                        for each in miners:
+                            blockchain.add_block(Block(each.address))
+                        self.chain_ready.emit(blockchain)
@@ -4,6 +4,8 @@ from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import QWidget, QFormLayout, QLineEdit, QPushButton, QHBoxLayout, \
     QVBoxLayout, QTabWidget, QMessageBox, QLabel, QFrame, QScrollArea, QInputDialog
 from GUI import BlockWidget
+from GUI.DemoLoader import DemoLoader
+from blockchain import error
 from blockchain.block import Block, Blockchain
 from blockchain.user import User
 from blockchain.transaction import make_deal
@@ -21,6 +23,7 @@ class MainWindow(QTabWidget):
         self.welcome_widget = QWidget()
         self.time = QLabel()
         self.timer = QTimer()
+        self.loading = QLabel()
 
         # 页面二：区块页面
         self.block_widget = QWidget()
@@ -42,9 +45,14 @@ class MainWindow(QTabWidget):
         self.le_address = QLineEdit()
         self.le_number = QLineEdit()
 
+        # 挖矿与交易按钮，前两个区块生成之前不可用
+        self.btn_createBlock = QPushButton()
+        self.btn_deal = QPushButton()
+
         # 存储信息
         self.all_user = []  # type: list[User]
         self.blockchain = Blockchain()
+        self.loader = None  # type: DemoLoader
 
         # 执行初始化操作
         self.func()
@@ -55,34 +63,43 @@ class MainWindow(QTabWidget):
         self.addTab(self.account_widget, "账户信息")
         self.addTab(self.deal_widget, "交易页面")
 
-        # 初始化
-        # 创建用户
-        print("为了方便展示，这里预创建了 10 个用户。")
-        from tqdm import tqdm
-        with tqdm(total=10) as loading_bar:
-            loading_bar.set_description("初始化进度")
-            for i in range(10):
-                self.all_user.append(User(User.create_user()))
-                loading_bar.update(1)
+        self.set_tab1_ui()
+        self.set_tab2_ui()
+        self.set_tab3_ui()
+        self.set_tab4_ui()
+
+        # 初始化：演示用户与前两个区块在后台生成，窗口先显示，用户生成一个显示一个
+        self.loader = DemoLoader(10)
+        self.loader.user_ready.connect(self.demo_user_ready)
+        self.loader.progress.connect(self.demo_progress)
+        self.loader.chain_ready.connect(self.demo_chain_ready)
+        self.loader.start()
+
+    def demo_user_ready(self, user: User) -> None:
+        self.all_user.append(user)
+        self.usersbox_update()
+
+    def demo_progress(self, done: int, total: int) -> None:
+        if done < total:
+            self.loading.setText("正在生成演示用户：" + str(done) + " / " + str(total))
+        else:
+            self.loading.setText("已预创建 " + str(total) + " 个演示用户")
 
+    def demo_chain_ready(self, blockchain: Blockchain) -> None:
+        print("为了方便展示，这里预创建了 10 个用户。")
         print("这里给出了两个用户的信息，方便演示挖矿和交易。")
         print("地址(User 2): " + self.all_user[0].address)
         print("压缩私匙: " + self.all_user[1].wif)
-
-        # 创建区块链
-        # 首先创建创世区块，矿工为 bright
-        foundation = Block(self.all_user[0].address)
-        second_block = Block(self.all_user[1].address)
-        # 创建区块链
-        blockchain = Blockchain()
-        blockchain.add_block(foundation)
-        blockchain.add_block(second_block)
         self.set_blockchain(blockchain)
+        self.usersbox_update()
+        self.btn_createBlock.setEnabled(True)
+        self.btn_deal.setEnabled(True)
 
-        self.set_tab1_ui()
-        self.set_tab2_ui()
-        self.set_tab3_ui()
-        self.set_tab4_ui()
+    def closeEvent(self, event) -> None:
+        # 等待后台生成结束，避免线程仍在运行时被销毁
+        if self.loader is not None:
+            self.loader.wait()
+        super().closeEvent(event)
 
     def set_tab1_ui(self):
         layout = QVBoxLayout()
@@ -93,10 +110,14 @@ class MainWindow(QTabWidget):
         self.time.setText(QTime.currentTime().toString())
         self.time.setFont(QFont("Microsoft YaHei", 15, 60))
         self.time.setAlignment(Qt.AlignCenter)
+        self.loading.setText("正在生成演示用户……")
+        self.loading.setFont(QFont("Microsoft YaHei", 10, 60))
+        self.loading.setAlignment(Qt.AlignCenter)
         layout.addStretch(10)
         layout.addWidget(wel, 0, Qt.AlignHCenter)
         layout.addStretch(1)
         layout.addWidget(self.time, 0, Qt.AlignHCenter)
+        layout.addWidget(self.loading, 0, Qt.AlignHCenter)
         layout.addStretch(10)
         self.welcome_widget.setLayout(layout)
 
@@ -120,14 +141,14 @@ class MainWindow(QTabWidget):
 
         buttonBox = QFrame()
         buttonBox.setFrameShape(QFrame.Box)
-        btn_createBlock = QPushButton()
-        btn_createBlock.setParent(buttonBox)
-        btn_createBlock.setText("创建新区块")
-        btn_createBlock.setFixedSize(200, 80)
-        btn_createBlock.move(45, 50)
+        self.btn_createBlock.setParent(buttonBox)
+        self.btn_createBlock.setText("创建新区块")
+        self.btn_createBlock.setFixedSize(200, 80)
+        self.btn_createBlock.move(45, 50)
+        self.btn_createBlock.setEnabled(False)
         self.tab2_layout.addWidget(buttonBox, 1)
 
-        btn_createBlock.clicked.connect(self.create_block_clicked)
+        self.btn_createBlock.clicked.connect(self.create_block_clicked)
 
         self.block_widget.setLayout(self.tab2_layout)
 
@@ -181,6 +202,7 @@ class MainWindow(QTabWidget):
     def set_tab3_ui(self):
         # 左侧：User 显示
         self.usersBox.setMinimumSize(750, max(800, 20 + len(self.all_user) * 215))
+        all_money = self.blockchain.balances([u.address for u in self.all_user])
 
         for i in range(len(self.all_user)):
             a = QFrame()
@@ -191,7 +213,7 @@ class MainWindow(QTabWidget):
             a.move(0, 10 + i * 215)
 
             addr = self.all_user[i].address
-            money = User.get_utxo(addr, self.blockchain)
+            money = all_money[i]
 
             lb_addr = QLabel()
             lb_addr.setText("地址：" + addr)
@@ -243,6 +265,7 @@ class MainWindow(QTabWidget):
     def usersbox_update(self):
         self.new_usersBox = QWidget()
         self.new_usersBox.setMinimumSize(750, max(800, 20 + len(self.all_user) * 215))
+        all_money = self.blockchain.balances([u.address for u in self.all_user])
 
         for i in range(len(self.all_user)):
             a = QFrame()
@@ -253,7 +276,7 @@ class MainWindow(QTabWidget):
             a.move(0, 10 + i * 215)
 
             addr = self.all_user[i].address
-            money = User.get_utxo(addr, self.blockchain)
+            money = all_money[i]
 
             lb_addr = QLabel()
             lb_addr.setText("地址：" + addr)
@@ -273,13 +296,13 @@ class MainWindow(QTabWidget):
         self.user_scroll.setWidget(self.usersBox)
 
     def set_tab4_ui(self):
-        btn_deal = QPushButton()
-        btn_deal.setText("点我进行交易")
-        btn_deal.clicked.connect(self.deal_clicked)
+        self.btn_deal.setText("点我进行交易")
+        self.btn_deal.setEnabled(False)
+        self.btn_deal.clicked.connect(self.deal_clicked)
         self.tab4_layout.addRow("你的压缩私匙 wif：", self.le_wif)
         self.tab4_layout.addRow("转账对象的地址：", self.le_address)
         self.tab4_layout.addRow("转账金额：", self.le_number)
-        self.tab4_layout.addRow(btn_deal)
+        self.tab4_layout.addRow(self.btn_deal)
 
         self.deal_widget.setLayout(self.tab4_layout)
 
@@ -302,8 +325,22 @@ class MainWindow(QTabWidget):
                 QMessageBox.information(self, "无法交易", "请确定你的地址输入正确(￢_￢)。", QMessageBox.Yes | QMessageBox.No,
                                               QMessageBox.Yes)
         else:
+            try:
+                make_deal(User(self.le_wif.text()), self.le_address.text(), int(self.le_number.text(), 10),
+                          self.blockchain)
+            except (ValueError, error.InvalidTransaction):
+                QMessageBox.information(self, "无法交易", "转账金额必须是正整数(￢_￢)。", QMessageBox.Yes | QMessageBox.No,
+                                        QMessageBox.Yes)
+                return
+            except error.CoinNotEnough:
+                QMessageBox.information(self, "无法交易", "余额不足(￢_￢)。", QMessageBox.Yes | QMessageBox.No,
+                                        QMessageBox.Yes)
+                return
+            except error.BlockIsOverFlow:
+                QMessageBox.information(self, "无法交易", "最后一个区块已满，请先创建新区块。",
+                                        QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+                return
             QMessageBox.information(self, "交易成功", "请查看账户来确认完成交易。", QMessageBox.Yes | QMessageBox.No,
                                           QMessageBox.Yes)
-            make_deal(User(self.le_wif.text()), self.le_address.text(), int(self.le_number.text(), 10), self.blockchain)
             self.blocksbox_update()
             self.usersbox_update()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+区块编码测试：对比二进制编码与 JSON 编码的大小及编码、解码速度，并检查往返结果一致。
+
+运行方式（在仓库根目录）::
+
+    python -m benchmark.codec [区块数]
+"""
+import random
+import sys
+import time
+from typing import List
+
+from blockchain import error
+from blockchain.block import Block, Blockchain
+from blockchain.codec import encode_block, decode_block, encode_block_json, decode_block_json
+from blockchain.transaction import make_deal
+from blockchain.user import User
+
+
+def build_chain(blocks: int = 20, users: int = 6, seed: int = 2021) -> Blockchain:
+    """
+    生成测试用的区块链，每个区块装满 10 条交易（余额不足时跳过）。
+
+    :param blocks: 区块数
+    :param users: 用户数
+    :param seed: 随机种子
+    :return: 区块链
+    """
+    rng = random.Random(seed)
+    people = [User(User.create_user()) for _ in range(users)]
+    chain = Blockchain(difficulty=0)
+    for each in people:
+        chain.add_block(Block(each.address))
+    while len(chain.blockList) < blocks:
+        if len(chain.blockList[-1].data) == 10:
+            chain.add_block(Block(rng.choice(people).address))
+            continue
+        sender, receiver = rng.sample(people, 2)
+        try:
+            make_deal(sender, receiver.address, rng.randint(1, 40), chain)
+        except error.CoinNotEnough:
+            chain.add_block(Block(sender.address))
+    return chain
+
+
+def fields(block: Block) -> list:
+    """
+    区块中参与编码的全部字段，用于比较往返结果。
+    """
+    return [block.timeStamp, block.preHash, block.merkleHash, block.blockHash, block.nonce, block.target,
+            [[tx.hash, tx.extra,
+              [[each.preHash, each.index, each.preScript, tuple(each.script[0]), tuple(each.script[1]), each.utxo]
+               for each in tx.inList],
+              [[each.value, each.index, each.script] for each in tx.outList]]
+             for tx in block.data]]
+
+
+def bench(blocks: List[Block], rounds: int = 20) -> None:
+    """
+    :param blocks: 测试用的区块
+    :param rounds: 重复次数
+    """
+    for name, encode, decode in (("JSON", encode_block_json, decode_block_json),
+                                 ("binary", encode_block, decode_block)):
+        payloads = [encode(each) for each in blocks]
+        for block, payload in zip(blocks, payloads):
+            again = decode(payload)
+            assert fields(again) == fields(block)
+            assert encode(again) == payload
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for each in blocks:
+                encode(each)
+        encoding = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for each in payloads:
+                decode(each)
+        decoding = time.perf_counter() - start
+        count = rounds * len(blocks)
+        print("{:<7s} 平均大小 {:>7.0f} 字节   编码 {:>7.1f} us/块   解码 {:>7.1f} us/块".format(
+            name, sum(len(each) for each in payloads) / len(payloads),
+            encoding / count * 1e6, decoding / count * 1e6))
+
+
+if __name__ == "__main__":
+    chain = build_chain(*(int(each) for each in sys.argv[1:2]))
+    print("区块 {} 个，交易 {} 条".format(len(chain.blockList), sum(len(each.data) for each in chain.blockList)))
+    bench(chain.blockList)
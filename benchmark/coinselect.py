@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+选币策略模拟：一个钱包反复收款、付款，统计各策略下每笔交易的平均输入数与最终 UTXO 个数。
+
+每个输入都意味着一次签名和一次验证，输入越少，签名与验证越便宜。
+
+运行方式（在仓库根目录）::
+
+    python -m benchmark.coinselect
+"""
+import random
+
+from blockchain.coinselect import STRATEGIES, select_coins
+from blockchain.utxo import Coin
+
+
+def simulate(strategy: str, rounds: int = 2000, seed: int = 2021) -> None:
+    """
+    :param strategy: 策略名
+    :param rounds: 模拟的交易笔数
+    :param seed: 随机种子
+    """
+    rng = random.Random(seed)
+    wallet = []
+    serial = 0
+    inputs = 0
+    payments = 0
+    for _ in range(rounds):
+        if rng.random() < 0.4 or not wallet:
+            wallet.append(Coin(str(serial), 0, rng.randint(1, 100), "wallet", 0))
+            serial += 1
+            continue
+        value = rng.randint(1, 120)
+        chosen = select_coins(wallet, value, strategy)
+        if chosen is None:
+            continue
+        picked = set(id(each) for each in chosen)
+        wallet = [each for each in wallet if id(each) not in picked]
+        change = sum(each.value for each in chosen) - value
+        if change:
+            wallet.append(Coin(str(serial), 1, change, "wallet", 0))
+            serial += 1
+        inputs += len(chosen)
+        payments += 1
+    print("{:<14s} 付款 {:>5d} 笔   平均输入数 {:>5.2f}   剩余 UTXO {:>4d} 个".format(
+        strategy, payments, inputs / max(payments, 1), len(wallet)))
+
+
+if __name__ == "__main__":
+    for name in STRATEGIES:
+        simulate(name)
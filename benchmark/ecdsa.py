@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+ECDSA 相关运算的微基准测试。
+
+运行方式（在仓库根目录）::
+
+    python -m benchmark.ecdsa
+"""
+import random
+import time
+from typing import Callable, List, Tuple
+
+from utils.ecdsa import ECDSA
+
+
+def timeit(func: Callable[[], object], repeat: int) -> float:
+    """
+    重复执行函数，返回单次平均耗时（秒）。
+
+    :param func: 被测函数，无参数
+    :param repeat: 重复次数
+    :return: 单次平均耗时
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def report(name: str, baseline: float, optimized: float) -> None:
+    """
+    打印一行对比结果。
+
+    :param name: 测试项名称
+    :param baseline: 参考实现单次耗时
+    :param optimized: 优化实现单次耗时
+    """
+    print("{:<28s} 参考 {:>9.3f} ms   优化 {:>9.3f} ms   加速 {:>6.2f}x".format(
+        name, baseline * 1000, optimized * 1000, baseline / optimized))
+
+
+def bench_curve_mul(repeat: int = 20) -> List[Tuple[str, float, float]]:
+    """
+    对比仿射坐标与 Jacobian 坐标的标量乘法。
+
+    :param repeat: 每项重复次数
+    :return: (名称, 参考耗时, 优化耗时) 列表
+    """
+    rng = random.Random(2021)
+    scalars = [rng.randrange(1, ECDSA.order) for _ in range(repeat)]
+    point = ECDSA.curve_mul(ECDSA.g, rng.randrange(1, ECDSA.order))
+    results = []
+
+    it = iter(scalars * 2)
+    baseline = timeit(lambda: ECDSA.curve_mul_affine(point, next(it)), repeat)
+    optimized = timeit(lambda: ECDSA.curve_mul(point, next(it)), repeat)
+    results.append(("curve_mul (256 bit)", baseline, optimized))
+
+    short = [rng.randrange(2 ** 150, 2 ** 160) for _ in range(repeat)]
+    it = iter(short * 2)
+    baseline = timeit(lambda: ECDSA.curve_mul_affine(point, next(it)), repeat)
+    optimized = timeit(lambda: ECDSA.curve_mul(point, next(it)), repeat)
+    results.append(("curve_mul (160 bit)", baseline, optimized))
+    return results
+
+
+def bench_mul_base(repeat: int = 20) -> List[Tuple[str, float, float]]:
+    """
+    对比通用标量乘法与生成元固定基表乘法，并给出预计算表的构建代价。
+
+    :param repeat: 每项重复次数
+    :return: (名称, 参考耗时, 优化耗时) 列表
+    """
+    info = ECDSA.base_table_info()
+    print("固定基表：窗口 {} 比特，{} 个点，构建 {:.1f} ms，约 {:.1f} KB".format(
+        info["window"], info["points"], info["build_seconds"] * 1000, info["memory_bytes"] / 1024))
+
+    rng = random.Random(2021)
+    scalars = [rng.randrange(1, ECDSA.order) for _ in range(repeat)]
+    it = iter(scalars * 2)
+    baseline = timeit(lambda: ECDSA.curve_mul(ECDSA.g, next(it)), repeat)
+    optimized = timeit(lambda: ECDSA.mul_base(next(it)), repeat)
+    return [("k * g", baseline, optimized)]
+
+
+def bench_verify(repeat: int = 20) -> List[Tuple[str, float, float]]:
+    """
+    对比两次独立标量乘法与 Straus/wNAF 联合乘法实现的 u1*g + u2*Q。
+
+    :param repeat: 每项重复次数
+    :return: (名称, 参考耗时, 优化耗时) 列表
+    """
+    rng = random.Random(2021)
+    key = ECDSA.mul_base(rng.randrange(1, ECDSA.order))
+    pairs = [(rng.randrange(1, ECDSA.order), rng.randrange(1, ECDSA.order)) for _ in range(repeat)]
+    ECDSA.curve_mul_multi([(ECDSA.g, 1)])
+
+    it = iter(pairs * 3)
+
+    def separate() -> None:
+        u1, u2 = next(it)
+        ECDSA.curve_add(ECDSA.curve_mul(ECDSA.g, u1), ECDSA.curve_mul(key, u2))
+
+    def separate_base() -> None:
+        u1, u2 = next(it)
+        ECDSA.curve_add(ECDSA.mul_base(u1), ECDSA.curve_mul(key, u2))
+
+    def joint() -> None:
+        u1, u2 = next(it)
+        ECDSA.curve_mul_multi([(ECDSA.g, u1), (key, u2)])
+
+    baseline = timeit(separate, repeat)
+    baseline_base = timeit(separate_base, repeat)
+    optimized = timeit(joint, repeat)
+    return [("u1 * g + u2 * Q", baseline, optimized),
+            ("u1 * g + u2 * Q (mul_base)", baseline_base, optimized)]
+
+
+def bench_verify_many(size: int = 10, repeat: int = 5) -> List[Tuple[str, float, float]]:
+    """
+    对比逐个调用 verify_signature 与 verify_many 验证一批签名，模拟验证一个区块中的全部输入。
+
+    :param size: 每批签名数
+    :param repeat: 重复次数
+    :return: (名称, 参考耗时, 优化耗时) 列表
+    """
+    rng = random.Random(2021)
+    keys = [rng.randrange(1, ECDSA.order) for _ in range(3)]
+    items = []
+    for i in range(size):
+        key = keys[i % len(keys)]
+        message = "message " + str(i)
+        items.append((message, ECDSA.mul_base(key), ECDSA.gen_signature(message, key)))
+
+    baseline = timeit(lambda: [ECDSA.verify_signature(*each) for each in items], repeat)
+    optimized = timeit(lambda: ECDSA.verify_many(items), repeat)
+    return [("verify x" + str(size), baseline, optimized)]
+
+
+def bench_inv(repeat: int = 200) -> List[Tuple[str, float, float]]:
+    """
+    对比各求逆后端与费马小定理参考实现，以及使用各后端时的一次签名验证。
+
+    :param repeat: 每项重复次数
+    :return: (名称, 参考耗时, 优化耗时) 列表
+    """
+    rng = random.Random(2021)
+    nums = [rng.randrange(1, ECDSA.p) for _ in range(repeat)]
+    it = iter(nums * (len(ECDSA.INV_BACKENDS) + 1))
+    baseline = timeit(lambda: ECDSA.inv_fermat(next(it)), repeat)
+    results = []
+    for name in ECDSA.INV_BACKENDS:
+        func = getattr(ECDSA, "inv_" + name)
+        results.append(("inv (" + name + ")", baseline, timeit(lambda: func(next(it)), repeat)))
+
+    key = rng.randrange(1, ECDSA.order)
+    item = "message", ECDSA.mul_base(key), ECDSA.gen_signature("message", key)
+    ECDSA.verify_signature(*item)
+    backend = ECDSA.INV_BACKEND
+    try:
+        ECDSA.set_inv_backend("fermat")
+        baseline = timeit(lambda: ECDSA.verify_signature(*item), 20)
+        for name in ECDSA.INV_BACKENDS:
+            ECDSA.set_inv_backend(name)
+            results.append(("verify_signature (" + name + ")", baseline,
+                            timeit(lambda: ECDSA.verify_signature(*item), 20)))
+    finally:
+        ECDSA.set_inv_backend(backend)
+    return results
+
+
+def main() -> None:
+    for name, baseline, optimized in bench_inv() + bench_curve_mul() + bench_mul_base() + bench_verify() + \
+            bench_verify_many():
+        report(name, baseline, optimized)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+交易内存占用测试：生成合成的交易链（每条交易 1 个输入、2 个输出），用 tracemalloc 统计每条交易占用的字节数。
+
+对照组为改用 __slots__ 之前的表示：普通对象、十六进制字符串哈希、输入持有上一个交易与发起人对象。
+合成链不签名，签名取随机数；与真实的链一样，同一用户的地址与公匙为同一对象，从固定大小的用户池中选取。
+
+运行方式（在仓库根目录）::
+
+    python -m benchmark.memory [交易数]
+"""
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from blockchain.transaction import Transaction, In, Out
+
+ADDRESS_POOL = 1000
+
+
+class LegacyIn(object):
+    def __init__(self, pre_out, index, sender, script) -> None:
+        self.sender = sender
+        self.preOut = pre_out
+        self.index = index
+        self.preHash = pre_out.hash
+        self.preScript = pre_out.outList[index].script
+        self.script = script
+        self.utxo = pre_out.outList[index].value
+
+
+class LegacyOut(object):
+    def __init__(self, value: int, address: str) -> None:
+        self.value = value
+        self.index = None
+        self.script = address
+        self.isUsed = False
+
+
+class LegacyTransaction(object):
+    def __init__(self) -> None:
+        self.inList = []
+        self.outList = []
+        self.extra = ""
+        self.hash = ""
+
+
+def random_pair(rng: random.Random) -> tuple:
+    return rng.getrandbits(256), rng.getrandbits(256)
+
+
+def build_legacy(count: int, addresses: list, keys: list, rng: random.Random) -> list:
+    chain = []
+    pre = LegacyTransaction()
+    pre.outList.append(LegacyOut(50, addresses[0]))
+    pre.hash = "%064x" % rng.getrandbits(256)
+    for i in range(count):
+        tx = LegacyTransaction()
+        k = i % len(addresses)
+        tx.inList.append(LegacyIn(pre, 0, addresses[k], [random_pair(rng), keys[k]]))
+        for j in range(2):
+            out = LegacyOut(rng.randint(1, 100), addresses[rng.randrange(len(addresses))])
+            out.index = j
+            tx.outList.append(out)
+        tx.hash = "%064x" % rng.getrandbits(256)
+        chain.append(tx)
+        pre = tx
+    return chain
+
+
+def build_slotted(count: int, addresses: list, keys: list, rng: random.Random) -> list:
+    chain = []
+    pre = Transaction()
+    pre.add_output(Out(50, addresses[0]))
+    pre.hashBytes = rng.getrandbits(256).to_bytes(32, "big")
+    for i in range(count):
+        tx = Transaction()
+        new = In.__new__(In)
+        new.preHashBytes = pre.hashBytes
+        new.index = 0
+        new.preScript = pre.outList[0].script
+        new.script = (random_pair(rng), keys[i % len(keys)])
+        new.utxo = pre.outList[0].value
+        tx.add_input(new)
+        for _ in range(2):
+            tx.add_output(Out(rng.randint(1, 100), addresses[rng.randrange(len(addresses))]))
+        tx.hashBytes = rng.getrandbits(256).to_bytes(32, "big")
+        chain.append(tx)
+        pre = tx
+    return chain
+
+
+def measure(name: str, build, count: int) -> None:
+    """
+    :param name: 名称
+    :param build: 生成交易链的函数
+    :param count: 交易数
+    """
+    rng = random.Random(2021)
+    addresses = ["1" + "%033x" % rng.getrandbits(132) for _ in range(ADDRESS_POOL)]
+    keys = [random_pair(rng) for _ in range(ADDRESS_POOL)]
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    chain = build(count, addresses, keys, rng)
+    seconds = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:<8s} {:>9d} 条交易   共 {:>8.1f} MB   每条 {:>6.0f} 字节   生成耗时 {:>6.1f} s".format(
+        name, len(chain), size / 2 ** 20, size / count, seconds))
+    del chain
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    measure("legacy", build_legacy, n)
+    measure("slotted", build_slotted, n)
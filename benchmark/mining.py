@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+挖矿性能测试：在不同难度下挖矿，统计尝试次数、耗时与哈希速率。
+
+运行方式（在仓库根目录）::
+
+    python -m benchmark.mining [最大难度] [多进程测试难度]
+"""
+import os
+import sys
+
+from blockchain.block import Block
+from blockchain.mining import MiningPool, mine, mine_parallel, target_from_difficulty
+
+
+def bench_mine(max_difficulty: int = 14, rounds: int = 3) -> None:
+    """
+    :param max_difficulty: 测试的最大难度（前导 0 比特数）
+    :param rounds: 每个难度挖矿的区块数
+    """
+    print("难度  平均尝试次数  平均耗时(ms)  哈希速率(次/秒)")
+    for difficulty in range(0, max_difficulty + 1, 2):
+        target = target_from_difficulty(difficulty)
+        attempts = 0
+        seconds = 0.0
+        for i in range(rounds):
+            block = Block("miner " + str(i))
+            stats = mine(block, target)
+            assert block.meets_target()
+            attempts += stats.attempts
+            seconds += stats.seconds
+        print("{:>4d}  {:>12.1f}  {:>12.2f}  {:>15.0f}".format(
+            difficulty, attempts / rounds, seconds / rounds * 1000, attempts / seconds))
+
+
+def bench_parallel(difficulty: int = 16, rounds: int = 3) -> None:
+    """
+    对比单进程与多进程（CPU 核数个进程）挖矿的总哈希速率。
+
+    :param difficulty: 难度（前导 0 比特数）
+    :param rounds: 挖矿的区块数
+    """
+    target = target_from_difficulty(difficulty)
+    print("难度 {}，单进程与 {} 个进程：".format(difficulty, os.cpu_count()))
+    # 与 Blockchain 一样复用同一个进程池，计时不含启动进程
+    pool = MiningPool()
+    try:
+        for name, func in (("单进程", mine), ("多进程", lambda block, target: mine_parallel(block, target, pool=pool))):
+            attempts = 0
+            seconds = 0.0
+            for i in range(rounds):
+                block = Block("miner " + str(i))
+                stats = func(block, target)
+                assert block.meets_target()
+                attempts += stats.attempts
+                seconds += stats.seconds
+            print("  {}  平均耗时 {:>8.1f} ms   哈希速率 {:>10.0f} 次/秒".format(
+                name, seconds / rounds * 1000, attempts / seconds))
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    bench_mine(*(int(each) for each in sys.argv[1:2]))
+    bench_parallel(*(int(each) for each in sys.argv[2:3]))
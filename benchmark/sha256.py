@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+sha256 的性能测试：参考压缩函数、优化后的压缩函数，以及作为上限参考的 hashlib。
+
+运行方式（在仓库根目录）::
+
+    python -m benchmark.sha256
+"""
+import hashlib
+import os
+import time
+from typing import Callable, List
+
+from utils import sha256
+from utils.sha256 import Sha256, my_sha256, sha256_midstate
+
+
+def rate(func: Callable[[bytes], object], messages: List[bytes], seconds: float = 1.0) -> float:
+    """
+    在给定时间内反复处理消息，返回每秒处理的次数。
+
+    :param func: 被测函数，参数为一条消息
+    :param messages: 消息列表，轮流使用
+    :param seconds: 测试时长
+    :return: 每秒次数
+    """
+    count = 0
+    start = time.perf_counter()
+    end = start + seconds
+    while True:
+        for each in messages:
+            func(each)
+        count += len(messages)
+        now = time.perf_counter()
+        if now >= end:
+            return count / (now - start)
+
+
+def with_reference_kernel(func: Callable[[bytes], object]) -> Callable[[bytes], object]:
+    """
+    包装被测函数，使其在调用期间使用参考压缩函数。
+
+    :param func: 被测函数
+    :return: 包装后的函数
+    """
+    def wrapper(data: bytes) -> object:
+        kernel = sha256.my_sha256_hash
+        sha256.my_sha256_hash = sha256.my_sha256_hash_reference
+        try:
+            return func(data)
+        finally:
+            sha256.my_sha256_hash = kernel
+    return wrapper
+
+
+def check_kernel(trials: int = 200) -> None:
+    """
+    随机校验：两个压缩函数结果一致，Sha256 与 hashlib 结果一致。
+
+    :param trials: 随机测试次数
+    """
+    for i in range(trials):
+        block = os.urandom(64)
+        assert sha256.my_sha256_hash(sha256.H0, block) == sha256.my_sha256_hash_reference(sha256.H0, block)
+        data = os.urandom(i * 3)
+        assert Sha256(data).digest() == hashlib.sha256(data).digest()
+    assert my_sha256("abc") == hashlib.sha256(b"abc").hexdigest()
+
+
+def bench_midstate(prefix_size: int = 800) -> None:
+    """
+    模拟挖矿：固定的区块头前缀加上不断变化的 nonce，对比每次完整哈希与复用 midstate。
+
+    :param prefix_size: 前缀长度（字节），默认约为 10 条交易的区块头
+    """
+    prefix = os.urandom(prefix_size)
+    nonces = [str(i).encode() for i in range(16)]
+    midstate = sha256_midstate(prefix)
+    assert midstate.digest_with(nonces[3]) == hashlib.sha256(prefix + nonces[3]).digest()
+    full = rate(lambda nonce: Sha256(prefix + nonce).digest(), nonces)
+    cached = rate(midstate.digest_with, nonces)
+    print("前缀 {} 字节 + nonce：".format(prefix_size))
+    print("  完整哈希     {:>12.0f} 次/秒".format(full))
+    print("  复用 midstate{:>12.0f} 次/秒   加速 {:.2f}x".format(cached, cached / full))
+
+
+def main() -> None:
+    check_kernel()
+    bench_midstate()
+    for size in (64, 1024):
+        messages = [os.urandom(size) for _ in range(16)]
+        print("消息长度 {} 字节：".format(size))
+        reference = rate(with_reference_kernel(lambda data: Sha256(data).digest()), messages)
+        optimized = rate(lambda data: Sha256(data).digest(), messages)
+        ceiling = rate(lambda data: hashlib.sha256(data).digest(), messages)
+        print("  参考压缩函数 {:>12.0f} 次/秒".format(reference))
+        print("  优化压缩函数 {:>12.0f} 次/秒   加速 {:.2f}x".format(optimized, optimized / reference))
+        print("  hashlib      {:>12.0f} 次/秒   为优化实现的 {:.0f} 倍".format(ceiling, ceiling / optimized))
+
+
+if __name__ == "__main__":
+    main()
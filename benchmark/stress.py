@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+并发压力测试：多个线程同时发起交易、查询余额与校验区块链，一个线程定时出块。
+
+交易线程中一部分直接写入最后一个区块（区块已满时自己出块），一部分提交到内存池。
+结束后检查：余额之和等于挖矿所得之和、UTXO 索引与遍历整条链的结果一致、整条链校验通过。
+
+运行方式（在仓库根目录）::
+
+    python -m benchmark.stress [运行秒数] [交易线程数] [查询线程数]
+"""
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from blockchain import error
+from blockchain.block import Block, Blockchain
+from blockchain.mempool import Mempool
+from blockchain.transaction import make_deal
+from blockchain.user import User
+
+USERS = 8
+
+
+def deal_worker(chain: Blockchain, pool: Mempool, people: list, use_pool: bool, stop: threading.Event,
+                counts: Counter, seed: int) -> None:
+    rng = random.Random(seed)
+    while not stop.is_set():
+        sender, receiver = rng.sample(people, 2)
+        try:
+            if use_pool:
+                make_deal(sender, receiver.address, rng.randint(1, 30), chain, mempool=pool)
+            else:
+                make_deal(sender, receiver.address, rng.randint(1, 30), chain)
+            counts["deals"] += 1
+        except error.BlockIsOverFlow:
+            chain.add_block(Block(sender.address))
+        except (error.CoinNotEnough, error.DoubleSpend, error.InvalidTransaction):
+            counts["rejected"] += 1
+
+
+def read_worker(chain: Blockchain, people: list, stop: threading.Event, counts: Counter, seed: int) -> None:
+    rng = random.Random(seed)
+    addresses = [each.address for each in people]
+    while not stop.is_set():
+        if rng.random() < 0.01:
+            issues = chain.validate()
+            assert not issues, issues
+            counts["validations"] += 1
+        else:
+            balances = chain.balances(addresses)
+            assert all(each >= 0 for each in balances)
+            counts["reads"] += 1
+
+
+def check(chain: Blockchain, people: list) -> None:
+    """
+    检查余额之和、UTXO 索引与 isUsed 标记是否与遍历整条链的结果一致，并校验整条链。
+    """
+    spent = set()
+    for block in chain.blockList:
+        for tx in block.data:
+            spent.update(each.outpoint for each in tx.inList)
+    expect = {}
+    for block in chain.blockList:
+        for tx in block.data:
+            for out in tx.outList:
+                used = (tx.hash, out.index) in spent
+                assert out.isUsed == used, "isUsed 与链上记录不一致"
+                if not used:
+                    expect[out.script] = expect.get(out.script, 0) + out.value
+    addresses = [each.address for each in people]
+    assert chain.balances(addresses) == [expect.get(each, 0) for each in addresses], "UTXO 索引与链上记录不一致"
+    assert sum(expect.values()) == 50 * len(chain.blockList), "余额之和不等于挖矿所得之和"
+    assert not chain.validate(), "区块链校验失败"
+
+
+def main(seconds: float = 10.0, dealers: int = 4, readers: int = 4) -> None:
+    logging.disable(logging.WARNING)
+    people = [User(User.create_user()) for _ in range(USERS)]
+    chain = Blockchain(difficulty=4)
+    for each in people:
+        chain.add_block(Block(each.address))
+    pool = Mempool(chain)
+    pool.start(people[0].address, 0.5)
+
+    stop = threading.Event()
+    # 每个线程各自计数，结束后再汇总，线程之间不共享计数器
+    counters = [Counter() for _ in range(dealers + readers)]
+    threads = [threading.Thread(target=deal_worker, args=(chain, pool, people, i % 2 == 0, stop, counters[i], i))
+               for i in range(dealers)]
+    threads += [threading.Thread(target=read_worker, args=(chain, people, stop, counters[dealers + i], 1000 + i))
+                for i in range(readers)]
+    for each in threads:
+        each.start()
+    time.sleep(seconds)
+    stop.set()
+    for each in threads:
+        each.join()
+    pool.stop()
+    while len(pool):
+        pool.assemble(people[0].address)
+
+    check(chain, people)
+    counts = sum(counters, Counter())
+    print("{:.0f} 秒：交易 {} 笔，被拒绝 {} 次，余额查询 {} 次，整链校验 {} 次，区块 {} 个，检查通过。".format(
+        seconds, counts["deals"], counts["rejected"], counts["reads"], counts["validations"], len(chain.blockList)))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(*([float(args[0])] if args else []), *(int(each) for each in args[1:3]))
@@ -1,9 +1,20 @@
 # -*- coding:utf-8 -*-
+import copy
 import time
 import logging
-from typing import List
-from utils.sha256 import my_sha256
-from blockchain.transaction import Transaction, Out
+import secrets
+import threading
+from typing import Dict, List, Optional, Tuple
+from utils.sha256 import Sha256
+from utils.rwlock import RWLock
+from blockchain.transaction import COINBASE_REWARD, Transaction, Out, verify_inputs
+from blockchain.merkle import MerkleTree
+from blockchain.mining import DEFAULT_DIFFICULTY, target_from_difficulty, meets_target, mine, mine_parallel, \
+    MiningPool, MiningStats
+from blockchain.utxo import Coin, OutPoint, UtxoSet
+from blockchain.storage import BlockStore, LazyBlockList
+from blockchain.codec import encode_block, decode_block
+from blockchain.validate import Issue, Progress, check_spends, validate_chain
 
 
 class Block(object):
@@ -20,10 +31,20 @@ class Block(object):
         """
         self.timeStamp = Block.set_timestamp()
         self.data = Block.dig_source(miner_address)
+        # 加入区块链后由 Blockchain.add_block 设置：区块在链中的下标，以及链的 UTXO 索引
+        self.height = None  # type: Optional[int]
+        self.utxo = None  # type: Optional[UtxoSet]
         self.preHash = '0' * 64
         self.merkleHash = ""
+        self.merkle = None  # type: MerkleTree
         self.set_merkle_hash()
         self.blockHash = ""
+        self.midstate = None  # type: Sha256
+        # 工作量证明：nonce 追加在区块头之后参与哈希，target 为 None 表示尚未挖矿
+        self.nonce = 0
+        self.target = None  # type: Optional[int]
+        # 挖过矿后区块头又发生变化、哈希不再满足目标值时为 True，等待 Blockchain.seal_tip 重新挖矿
+        self.dirty = False
         self.set_block_hash()
         logging.debug("新区块(BlockHash='" + self.blockHash + "')成功生成。")
 
@@ -41,11 +62,13 @@ class Block(object):
         """
         生成每个新区块的交易信息，只包含挖矿所得。
 
+        coinbase 交易带有随机的附加数据，保证同一矿工多次挖矿所得的交易哈希互不相同。
+
         :param miner_address: 矿工地址
         :return: 初始的交易信息
         """
-        coinbase = Transaction()
-        new = Out(50, miner_address)
+        coinbase = Transaction(secrets.token_hex(8))
+        new = Out(COINBASE_REWARD, miner_address)
         coinbase.add_output(new)
         coinbase.seal()
         return [coinbase]
@@ -53,45 +76,134 @@ class Block(object):
     # 在该区块中增加交易
     def add_transaction(self, new_transaction: Transaction) -> None:
         """
-        区块中新增交易。
+        区块中新增交易，Merkle 树只更新新叶子所在的路径。
 
         :param new_transaction: 新增的交易
         """
+        if self.merkle is None:
+            self.set_merkle_hash()
         self.data.append(new_transaction)
-        self.set_merkle_hash()
-        self.set_block_hash()
+        if self.utxo is not None:
+            self.utxo.add_transaction(new_transaction, self.height)
+        self.merkleHash = self.merkle.append(new_transaction.hash)
+        self.reseal()
 
     def set_merkle_hash(self) -> None:
         """
-        通过传入的交易来计算 Merkle Hash。
+        通过传入的交易重建整棵 Merkle 树，并计算 Merkle Hash。
+
+        各层中间节点保存在 self.merkle 中，之后追加交易只需增量更新。
+        """
+        self.merkle = MerkleTree([each.hash for each in self.data])
+        self.merkleHash = self.merkle.root
+
+    def merkle_proof(self, tx_hash: str) -> Optional[List[Tuple[str, str]]]:
+        """
+        给出交易在本区块中的 Merkle 包含证明，可交给 blockchain.merkle.verify_merkle_proof 验证。
+
+        :param tx_hash: 交易哈希
+        :return: 证明路径，交易不在区块中时为 None
+        """
+        if self.merkle is None:
+            self.set_merkle_hash()
+        for i, each in enumerate(self.data):
+            if each.hash == tx_hash:
+                return self.merkle.proof(i)
+        return None
+
+    def header_midstate(self) -> Sha256:
         """
-        cur = []  # type: List[str]
+        区块头中参与哈希的固定部分（时间戳、各交易哈希、上个区块哈希与 Merkle Hash）的 sha256 中间状态。
+
+        各部分逐段送入 sha256，不拼接整个字符串。
+
+        :return: 处理完区块头前缀的 Sha256 对象
+        """
+        h = Sha256(str(self.timeStamp).encode())
         for each in self.data:
-            cur.append(each.hash)
-        nxt = []  # type: List[str]
-        while len(cur) != 1:
-            last = None
-            for i, each in enumerate(cur):
-                if i % 2 == 0:
-                    if i == len(cur) - 1:
-                        nxt.append(my_sha256(my_sha256(each + each)))
-                    else:
-                        last = each
-                else:
-                    nxt.append((my_sha256(last + each)))
-            cur = nxt
-            nxt = []
-        self.merkleHash = cur[0]
+            h.update(each.hash.encode())
+        h.update((self.preHash + self.merkleHash).encode())
+        return h
 
     def set_block_hash(self) -> None:
         """
-        通过传入的区块来计算当前区块的 Block Hash
+        通过传入的区块与当前 nonce 来计算当前区块的 Block Hash。
+
+        同时保存区块头前缀的 midstate，供 hash_with_suffix 复用。
+        """
+        self.midstate = self.header_midstate()
+        self.blockHash = self.hash_with_suffix(str(self.nonce))
+
+    def meets_target(self) -> bool:
+        """
+        :return: 区块已挖矿且哈希满足目标值时为 True
         """
-        string = str(self.timeStamp)
-        for each in self.data:
-            string += each.hash
-        string += self.preHash + self.merkleHash
-        self.blockHash = my_sha256(string)
+        return self.target is not None and meets_target(self.blockHash, self.target)
+
+    def reseal(self) -> None:
+        """
+        区块头变化后重新计算 Block Hash；若区块已挖过矿且哈希不再满足目标值，则标记为 dirty。
+
+        这里不挖矿：make_deal 持有写锁写入交易，由区块链在锁外补做工作量证明，见 Blockchain.seal_tip。
+        """
+        self.set_block_hash()
+        self.dirty = self.target is not None and not self.meets_target()
+
+    def hash_with_suffix(self, suffix: str) -> str:
+        """
+        从区块头前缀的 midstate 出发，计算前缀追加 suffix 后的哈希，只需处理最后一两个分组。
+
+        :param suffix: 追加在区块头之后的内容
+        :return: 十六进制哈希值
+        """
+        if self.midstate is None:
+            self.midstate = self.header_midstate()
+        return self.midstate.hexdigest_with(suffix.encode())
+
+    def verify_all_inputs(self, utxo: Optional[UtxoSet] = None) -> bool:
+        """
+        验证区块中所有交易输入，用于区块加入区块链（应用到 UTXO 索引）之前：
+
+            一. 在 UTXO 索引中查找每个输入引用的输出，必须存在且未花费，地址与金额与输入记录一致，
+                区块中靠前的交易产生的输出也可以被花费，见 blockchain.validate.check_spends
+
+            二. 公匙对应引用输出的锁定地址，且签名有效
+
+        :param utxo: 加入前的 UTXO 索引，默认为 self.utxo
+        :return: 全部通过为 True，否则为 False，并记录未通过的输入
+        """
+        if utxo is None:
+            utxo = self.utxo
+        if utxo is None:
+            raise ValueError("没有可用于查找引用输出的 UTXO 索引")
+        ok = True
+        created = UtxoSet()
+        spent = set()
+
+        def lookup(outpoint: OutPoint) -> Optional[Coin]:
+            if outpoint in spent:
+                return None
+            return created.get(outpoint) or utxo.get(outpoint)
+
+        for i, each in enumerate(self.data):
+            for problem in check_spends(each, i, lookup):
+                logging.warning("区块(BlockHash='" + self.blockHash + "')中" + problem + "。")
+                ok = False
+            spent.update(each_in.outpoint for each_in in each.inList)
+            created.add_transaction(each, self.height)
+
+        positions = []
+        inputs = []
+        for i, each in enumerate(self.data):
+            for j, each_in in enumerate(each.inList):
+                positions.append((i, j))
+                inputs.append(each_in)
+        for (i, j), result in zip(positions, verify_inputs(inputs)):
+            if not result:
+                logging.warning("区块(BlockHash='" + self.blockHash + "')中第 " + str(i) +
+                                " 条交易的第 " + str(j) + " 个输入验证失败。")
+                ok = False
+        return ok
 
     def link(self, pre: str) -> None:
         """
@@ -100,18 +212,291 @@ class Block(object):
         :param pre: 上个区块的 Block Hash
         """
         self.preHash = pre
-        self.set_block_hash()
+        self.reseal()
 
 
 class Blockchain(object):
     """
     区块链，本质是区块的 list 集合。
+
+    可在多个线程中共用：查询（余额、交易、校验）持有读锁，可以同时进行；
+    修改区块链的操作（出块、make_deal 写入交易、写入磁盘）持有写锁，同一时刻只有一个。
+    直接访问 blockList 或 utxo 的代码应自行持有 lock。
     """
-    def __init__(self):
+    def __init__(self, difficulty: int = DEFAULT_DIFFICULTY, workers: int = 1):
+        """
+        :param difficulty: 挖矿难度，即区块哈希需要的前导 0 比特数
+        :param workers: 挖矿进程数，大于 1 时使用多进程挖矿
+        """
         self.blockList = []  # type: List[Block]
+        self.utxo = UtxoSet()
+        self.difficulty = difficulty
+        self.workers = workers
+        self.last_mining_stats = None  # type: Optional[MiningStats]
+        # 多进程挖矿的进程池，第一次挖矿时创建，close 时关闭
+        self._pool = None  # type: Optional[MiningPool]
+        self._pool_lock = threading.Lock()
+        # 磁盘存储，由 Blockchain.open 设置；以及各区块最近一次写入磁盘时的 Block Hash
+        self.store = None  # type: Optional[BlockStore]
+        self._stored_hash = {}  # type: Dict[int, str]
+        self.lock = RWLock()
+
+    @classmethod
+    def open(cls, path: str, difficulty: int = DEFAULT_DIFFICULTY, workers: int = 1) -> "Blockchain":
+        """
+        打开磁盘上的区块链，目录不存在时创建一条空链。
+
+        只读取区块索引和 UTXO 快照，区块本身在第一次被访问时才解码。
+        若 UTXO 快照缺失或过期，则重放整条链重建。
+
+        :param path: 存储目录
+        :param difficulty: 挖矿难度
+        :param workers: 挖矿进程数
+        :return: 区块链
+        """
+        chain = cls(difficulty, workers)
+        chain.store = BlockStore(path)
+        chain.blockList = LazyBlockList(len(chain.store), chain._load_block)
+        utxo = chain.store.load_utxo()
+        if utxo is None:
+            for block in chain.blockList:
+                for each in block.data:
+                    chain.utxo.add_transaction(each, block.height)
+            for _, block in chain.blockList.loaded():
+                chain._mark_spent(block)
+        else:
+            chain.utxo = utxo
+        logging.debug("已打开区块链(path='" + path + "')，共 " + str(len(chain.blockList)) + " 个区块。")
+        return chain
+
+    def _load_block(self, height: int) -> Block:
+        """
+        从磁盘读取并解码第 height 个区块。
+        """
+        block = decode_block(self.store.read(height))
+        block.height = height
+        block.utxo = self.utxo
+        self._stored_hash[height] = block.blockHash
+        self._mark_spent(block)
+        return block
+
+    def _mark_spent(self, block: Block) -> None:
+        """
+        根据 UTXO 索引设置区块中各输出的 isUsed。
+        """
+        for each in block.data:
+            for out in each.outList:
+                out.isUsed = (each.hash, out.index) not in self.utxo
+
+    def flush(self) -> None:
+        """
+        将新增或有变化的区块追加写入磁盘，并更新 UTXO 快照。
+
+        写入前先为最后一个区块补做工作量证明（见 seal_tip），磁盘上的区块都满足目标值。
+        """
+        if self.store is None:
+            raise ValueError("区块链没有关联磁盘存储，请使用 Blockchain.open 打开")
+        while True:
+            self.seal_tip()
+            with self.lock.write():
+                if self._tip_dirty():
+                    continue
+                self._write_blocks()
+                return
+
+    def _write_blocks(self) -> None:
+        """
+        flush 的写入部分，调用者持有写锁。
+        """
+        if isinstance(self.blockList, LazyBlockList):
+            blocks = self.blockList.loaded()
+        else:
+            blocks = enumerate(self.blockList)
+        for height, block in blocks:
+            if height >= len(self.store) or self._stored_hash.get(height) != block.blockHash:
+                self.store.write(height, encode_block(block))
+                self._stored_hash[height] = block.blockHash
+        self.store.save_utxo(self.utxo)
+        self.store.flush()
+
+    def close(self) -> None:
+        """
+        写入未保存的区块并关闭磁盘存储，同时关闭挖矿进程池。
+        """
+        while self.store is not None:
+            self.seal_tip()
+            with self.lock.write():
+                if self.store is None or self._tip_dirty():
+                    continue
+                self._write_blocks()
+                self.store.close()
+                self.store = None
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    @property
+    def target(self) -> int:
+        """
+        :return: 当前难度对应的目标值
+        """
+        return target_from_difficulty(self.difficulty)
 
     def add_block(self, new_block: Block) -> None:
-        if len(self.blockList) > 0:
-            new_block.link(self.blockList[-1].blockHash)
-        self.blockList.append(new_block)
+        """
+        链接上个区块并挖矿，之后将区块加入区块链，并将其中的交易加入 UTXO 索引。
+
+        挖矿时不持有锁，其他线程仍可查询和交易；写锁只在加入时持有。
+        若挖矿期间最后一个区块已经变化，则释放锁，重新链接并挖矿。
+
+        :param new_block: 新区块
+        """
+        while True:
+            pre = self.seal_tip()
+            self.seal(new_block, pre)
+            if self.append(new_block, pre):
+                return
+            logging.debug("挖矿期间最后一个区块已变化，重新链接并挖矿。")
+
+    def tip(self) -> Optional[str]:
+        """
+        调用者应持有 lock。
+
+        :return: 最后一个区块的 Block Hash，空链为 None
+        """
+        return self.blockList[-1].blockHash if len(self.blockList) > 0 else None
+
+    def _tip_dirty(self) -> bool:
+        """
+        调用者应持有 lock。
+
+        :return: 最后一个区块等待重新挖矿时为 True
+        """
+        return len(self.blockList) > 0 and self.blockList[-1].dirty
+
+    def _mine(self, block: Block) -> None:
+        """
+        按配置的进程数挖矿，不持有 lock。多进程时复用同一个进程池，同一时刻只挖一个区块。
+        """
+        if self.workers > 1:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = MiningPool(self.workers)
+                self.last_mining_stats = mine_parallel(block, self.target, pool=self._pool)
+        else:
+            self.last_mining_stats = mine(block, self.target)
+
+    def seal(self, new_block: Block, pre: Optional[str]) -> None:
+        """
+        链接上个区块并挖矿，不持有锁。
+
+        :param new_block: 新区块
+        :param pre: 上个区块的 Block Hash，创世区块为 None
+        """
+        if pre is not None:
+            new_block.link(pre)
+        self._mine(new_block)
+
+    def seal_tip(self) -> Optional[str]:
+        """
+        为 dirty 的最后一个区块补做工作量证明。make_deal 每写入一条交易都会让它变为 dirty，
+        这里只在区块即将被引用（出块、写入磁盘）时挖一次。
+
+        在区块头的副本上挖矿，不持有锁；写回前确认最后一个区块没有再变化，否则重新挖。
+
+        :return: 最后一个区块的 Block Hash，空链为 None
+        """
+        while True:
+            with self.lock.read():
+                if not len(self.blockList):
+                    return None
+                tip = self.blockList[-1]
+                if not tip.dirty:
+                    return tip.blockHash
+                header = (tip.preHash, tip.merkleHash, len(tip.data))
+                probe = copy.copy(tip)
+                probe.data = list(tip.data)
+            self._mine(probe)
+            with self.lock.write():
+                if self.blockList[-1] is tip and (tip.preHash, tip.merkleHash, len(tip.data)) == header:
+                    tip.midstate = probe.midstate
+                    tip.nonce = probe.nonce
+                    tip.blockHash = probe.blockHash
+                    tip.target = probe.target
+                    tip.dirty = False
+                    return tip.blockHash
+
+    def append(self, new_block: Block, pre: Optional[str]) -> bool:
+        """
+        将已经以 pre 为上个区块挖好矿的区块加入区块链，并将其中的交易加入 UTXO 索引。
+
+        :param new_block: 已用 seal 挖矿的新区块
+        :param pre: 挖矿时链接的上个区块的 Block Hash
+        :return: 最后一个区块已经不是 pre 时不加入，返回 False
+        """
+        with self.lock.write():
+            if self.tip() != pre:
+                return False
+            new_block.height = len(self.blockList)
+            new_block.utxo = self.utxo
+            self.blockList.append(new_block)
+            for each in new_block.data:
+                self.utxo.add_transaction(each, new_block.height)
         logging.debug("已将新区块(block hash = '" + new_block.blockHash + "')加入区块链。")
+        return True
+
+    def snapshot(self) -> List[Block]:
+        """
+        当前区块列表的快照。除最后一个区块外，上链的区块不会再变化，直接共用；
+        最后一个区块还可能被 make_deal 写入交易，因此复制一份；它若是 dirty 的，在副本上补做工作量证明。
+
+        :return: 区块列表
+        """
+        with self.lock.read():
+            blocks = list(self.blockList)
+            if blocks:
+                tip = blocks[-1]
+                blocks[-1] = decode_block(encode_block(tip))
+                blocks[-1].height = len(blocks) - 1
+                blocks[-1].dirty = tip.dirty
+        if blocks and blocks[-1].dirty:
+            self._mine(blocks[-1])
+        return blocks
+
+    def validate(self, workers: int = 1, progress: Optional[Progress] = None) -> List[Issue]:
+        """
+        完整校验整条链：区块间的哈希链接、每个输入花费的输出、交易哈希、Merkle 根、Block Hash、工作量证明与全部签名。
+
+        从磁盘载入的链可以用它确认未被篡改，详见 blockchain.validate.validate_chain。
+        校验的是调用时的快照（见 snapshot），校验期间不持有锁，不影响出块与交易。
+
+        :param workers: 进程数，大于 1 时后两个阶段分发到多个进程
+        :param progress: 进度回调，参数为 (阶段名, 已完成区块数, 区块总数)
+        :return: (区块下标, 问题描述) 列表，空列表表示整条链有效
+        """
+        return validate_chain(self.snapshot(), self.target, workers, progress)
+
+    def balances(self, addresses: List[str]) -> List[int]:
+        """
+        批量查询余额，每个地址 O(1)，与链的长度无关。
+
+        :param addresses: 地址列表
+        :return: 与 addresses 对应的余额
+        """
+        with self.lock.read():
+            return self.utxo.balances(addresses)
+
+    def get_transaction(self, height: int, tx_hash: str) -> Optional[Transaction]:
+        """
+        在指定区块中按哈希查找交易。
+
+        :param height: 区块在链中的下标
+        :param tx_hash: 交易哈希
+        :return: 对应交易，不存在时为 None
+        """
+        with self.lock.read():
+            for each in self.blockList[height].data:
+                if each.hash == tx_hash:
+                    return each
+        return None
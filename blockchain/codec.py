@@ -0,0 +1,301 @@
+# -*- coding:utf-8 -*-
+"""
+区块、交易、输入与输出的紧凑二进制编码。
+
+整数（金额、下标、nonce、计数、长度）使用无符号 varint（LEB128）；哈希存为 32 字节原始值；
+签名 (r, s) 与公匙 (x, y) 各为两个 32 字节大端整数；地址等字符串为 varint 长度加 UTF-8。
+
+编码函数向 bytearray 追加内容；解码函数从 memoryview 的 pos 处读取，返回 (对象, 新的 pos)，
+读取过程中只对 memoryview 切片，不复制中间的 bytes。
+
+另有 JSON 编码作为对照，见 encode_block_json / decode_block_json。
+"""
+import json
+import struct
+from typing import Optional, Tuple
+from blockchain.transaction import Transaction, In, Out
+
+CODEC_VERSION = 1
+HASH_SIZE = 32
+INT_SIZE = 32
+_DOUBLE = struct.Struct("<d")
+
+
+def write_varint(buf: bytearray, n: int) -> None:
+    """
+    追加一个无符号 varint。
+
+    :param buf: 输出缓冲区
+    :param n: 非负整数
+    """
+    if n < 0:
+        raise ValueError("varint 不能为负数")
+    while n > 0x7f:
+        buf.append((n & 0x7f) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def read_varint(view: memoryview, pos: int) -> Tuple[int, int]:
+    """
+    :param view: 输入
+    :param pos: 起始位置
+    :return: (整数, 新的位置)
+    """
+    n = view[pos]
+    if n < 0x80:
+        return n, pos + 1
+    n = 0
+    shift = 0
+    while True:
+        byte = view[pos]
+        pos += 1
+        n |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def write_hash(buf: bytearray, hex_hash: str) -> None:
+    write_raw_hash(buf, bytes.fromhex(hex_hash))
+
+
+def read_hash(view: memoryview, pos: int) -> Tuple[str, int]:
+    return view[pos:pos + HASH_SIZE].hex(), pos + HASH_SIZE
+
+
+def write_raw_hash(buf: bytearray, raw: bytes) -> None:
+    if len(raw) != HASH_SIZE:
+        raise ValueError("哈希长度应为 32 字节：" + raw.hex())
+    buf += raw
+
+
+def read_raw_hash(view: memoryview, pos: int) -> Tuple[bytes, int]:
+    return bytes(view[pos:pos + HASH_SIZE]), pos + HASH_SIZE
+
+
+def write_str(buf: bytearray, s: str) -> None:
+    raw = s.encode()
+    write_varint(buf, len(raw))
+    buf += raw
+
+
+def read_str(view: memoryview, pos: int) -> Tuple[str, int]:
+    size, pos = read_varint(view, pos)
+    return str(view[pos:pos + size], "utf-8"), pos + size
+
+
+def write_pair(buf: bytearray, pair: Tuple[int, int]) -> None:
+    """
+    追加签名 (r, s) 或公匙 (x, y)，共 64 字节。
+    """
+    buf += pair[0].to_bytes(INT_SIZE, "big")
+    buf += pair[1].to_bytes(INT_SIZE, "big")
+
+
+def read_pair(view: memoryview, pos: int) -> Tuple[Tuple[int, int], int]:
+    mid = pos + INT_SIZE
+    end = mid + INT_SIZE
+    return (int.from_bytes(view[pos:mid], "big"), int.from_bytes(view[mid:end], "big")), end
+
+
+def encode_out(buf: bytearray, out: Out) -> None:
+    """
+    输出：金额、锁定脚本。isUsed 不编码，由 UTXO 索引推出。
+    """
+    write_varint(buf, out.value)
+    write_str(buf, out.script)
+
+
+def decode_out(view: memoryview, pos: int) -> Tuple[Out, int]:
+    value, pos = read_varint(view, pos)
+    address, pos = read_str(view, pos)
+    return Out(value, address), pos
+
+
+def encode_in(buf: bytearray, new: In) -> None:
+    """
+    输入：引用的交易哈希、输出下标、锁定脚本、签名、公匙、金额。
+    """
+    write_raw_hash(buf, new.preHashBytes)
+    write_varint(buf, new.index)
+    write_str(buf, new.preScript)
+    write_pair(buf, new.script[0])
+    write_pair(buf, new.script[1])
+    write_varint(buf, new.utxo)
+
+
+def decode_in(view: memoryview, pos: int) -> Tuple[In, int]:
+    new = In.__new__(In)
+    new.preHashBytes, pos = read_raw_hash(view, pos)
+    new.index, pos = read_varint(view, pos)
+    new.preScript, pos = read_str(view, pos)
+    sign, pos = read_pair(view, pos)
+    public_key, pos = read_pair(view, pos)
+    new.script = (sign, public_key)
+    new.utxo, pos = read_varint(view, pos)
+    return new, pos
+
+
+def encode_transaction(buf: bytearray, tx: Transaction) -> None:
+    """
+    交易：哈希、附加数据、输入、输出。
+    """
+    write_raw_hash(buf, tx.hashBytes)
+    write_str(buf, tx.extra)
+    write_varint(buf, len(tx.inList))
+    for each in tx.inList:
+        encode_in(buf, each)
+    write_varint(buf, len(tx.outList))
+    for each in tx.outList:
+        encode_out(buf, each)
+
+
+def decode_transaction(view: memoryview, pos: int) -> Tuple[Transaction, int]:
+    """
+    交易哈希取自编码，不重新计算。
+    """
+    tx_hash, pos = read_raw_hash(view, pos)
+    extra, pos = read_str(view, pos)
+    tx = Transaction(extra)
+    count, pos = read_varint(view, pos)
+    for _ in range(count):
+        new, pos = decode_in(view, pos)
+        tx.add_input(new)
+    count, pos = read_varint(view, pos)
+    for _ in range(count):
+        new, pos = decode_out(view, pos)
+        tx.add_output(new)
+    tx.hashBytes = tx_hash
+    return tx, pos
+
+
+def encode_block(block: "Block") -> bytes:
+    """
+    区块：版本号、时间戳（8 字节 double）、上个区块哈希、Merkle 根、区块哈希、nonce、目标值、交易。
+
+    目标值前有 1 字节标记，0 表示未挖矿，1 表示后接 32 字节目标值。
+
+    :param block: type=Block，区块
+    :return: 编码结果
+    """
+    buf = bytearray([CODEC_VERSION])
+    buf += _DOUBLE.pack(block.timeStamp)
+    write_hash(buf, block.preHash)
+    write_hash(buf, block.merkleHash)
+    write_hash(buf, block.blockHash)
+    write_varint(buf, block.nonce)
+    if block.target is None:
+        buf.append(0)
+    else:
+        buf.append(1)
+        buf += block.target.to_bytes(INT_SIZE, "big")
+    write_varint(buf, len(block.data))
+    for each in block.data:
+        encode_transaction(buf, each)
+    return bytes(buf)
+
+
+def decode_block(data) -> "Block":
+    """
+    由编码还原区块。交易哈希与区块哈希直接取自编码，不重新计算；Merkle 树与 midstate 在用到时才构建。
+
+    :param data: encode_block 的结果，bytes、bytearray、mmap 或 memoryview 均可
+    :return: type=Block，区块
+    """
+    from blockchain.block import Block
+    view = memoryview(data)
+    if view[0] != CODEC_VERSION:
+        raise ValueError("不支持的编码版本：" + str(view[0]))
+    block = Block.__new__(Block)
+    block.timeStamp, = _DOUBLE.unpack_from(view, 1)
+    pos = 1 + _DOUBLE.size
+    block.preHash, pos = read_hash(view, pos)
+    block.merkleHash, pos = read_hash(view, pos)
+    block.blockHash, pos = read_hash(view, pos)
+    block.nonce, pos = read_varint(view, pos)
+    flag = view[pos]
+    pos += 1
+    block.target = None  # type: Optional[int]
+    if flag:
+        block.target = int.from_bytes(view[pos:pos + INT_SIZE], "big")
+        pos += INT_SIZE
+    count, pos = read_varint(view, pos)
+    block.data = []
+    for _ in range(count):
+        tx, pos = decode_transaction(view, pos)
+        block.data.append(tx)
+    if pos != len(view):
+        raise ValueError("区块编码末尾有多余数据")
+    block.height = None
+    block.utxo = None
+    block.merkle = None
+    block.midstate = None
+    block.dirty = False
+    return block
+
+
+def encode_block_json(block: "Block") -> bytes:
+    """
+    将区块编码为 JSON，作为二进制编码的对照。
+
+    :param block: type=Block，区块
+    :return: UTF-8 编码的 JSON
+    """
+    data = []
+    for tx in block.data:
+        data.append({
+            "hash": tx.hash,
+            "extra": tx.extra,
+            "in": [[each.preHash, each.index, each.preScript, list(each.script[0]), list(each.script[1]), each.utxo]
+                   for each in tx.inList],
+            "out": [[each.value, each.script] for each in tx.outList],
+        })
+    return json.dumps({
+        "timeStamp": block.timeStamp,
+        "preHash": block.preHash,
+        "merkleHash": block.merkleHash,
+        "blockHash": block.blockHash,
+        "nonce": block.nonce,
+        "target": block.target,
+        "data": data,
+    }, separators=(",", ":")).encode()
+
+
+def decode_block_json(payload: bytes) -> "Block":
+    """
+    由 JSON 还原区块。
+
+    :param payload: encode_block_json 的结果
+    :return: type=Block，区块
+    """
+    from blockchain.block import Block
+    record = json.loads(payload)
+    block = Block.__new__(Block)
+    block.timeStamp = record["timeStamp"]
+    block.data = []
+    for each in record["data"]:
+        tx = Transaction(each["extra"])
+        for pre_hash, index, pre_script, sign, public_key, value in each["in"]:
+            new = In.__new__(In)
+            new.index = index
+            new.preHashBytes = bytes.fromhex(pre_hash)
+            new.preScript = pre_script
+            new.script = (tuple(sign), tuple(public_key))
+            new.utxo = value
+            tx.add_input(new)
+        for value, address in each["out"]:
+            tx.add_output(Out(value, address))
+        tx.hash = each["hash"]
+        block.data.append(tx)
+    block.height = None
+    block.utxo = None
+    block.preHash = record["preHash"]
+    block.merkleHash = record["merkleHash"]
+    block.merkle = None
+    block.blockHash = record["blockHash"]
+    block.midstate = None
+    block.nonce = record["nonce"]
+    block.target = record["target"]
+    block.dirty = False
+    return block
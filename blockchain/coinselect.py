@@ -0,0 +1,140 @@
+# -*- coding:utf-8 -*-
+from typing import Callable, Dict, List, Optional
+from blockchain.utxo import Coin
+
+# 单笔交易最多引用的输入数，合并模式下也不超过这个数
+MAX_INPUTS = 50
+# 分支定界的最大搜索次数
+BNB_MAX_TRIES = 100000
+
+
+def select_first_fit(coins: List[Coin], value: int) -> Optional[List[Coin]]:
+    """
+    按上链顺序依次选取，直到金额足够。
+
+    :param coins: 可用的 UTXO，按上链顺序排列
+    :param value: 需要的金额
+    :return: 选中的 UTXO，金额不足时为 None
+    """
+    chosen = []
+    total = 0
+    for each in coins:
+        chosen.append(each)
+        total += each.value
+        if total >= value:
+            return chosen
+    return None
+
+
+def select_largest_first(coins: List[Coin], value: int) -> Optional[List[Coin]]:
+    """
+    按金额从大到小选取，输入数最少。
+
+    :param coins: 可用的 UTXO
+    :param value: 需要的金额
+    :return: 选中的 UTXO，金额不足时为 None
+    """
+    return select_first_fit(sorted(coins, key=lambda each: each.value, reverse=True), value)
+
+
+def select_branch_and_bound(coins: List[Coin], value: int) -> Optional[List[Coin]]:
+    """
+    分支定界搜索金额恰好等于 value 的组合，这样交易不需要找零输出。
+
+    按金额从大到小深度优先搜索，剩余金额之和不够或已经超出时剪枝，最多搜索 BNB_MAX_TRIES 次。
+
+    :param coins: 可用的 UTXO
+    :param value: 需要的金额
+    :return: 金额恰好相等的 UTXO 组合，找不到时为 None
+    """
+    if value <= 0:
+        return None
+    ordered = sorted((each for each in coins if 0 < each.value <= value), key=lambda each: each.value, reverse=True)
+    # rest[i] 为 ordered[i:] 的金额之和
+    rest = [0] * (len(ordered) + 1)
+    for i in range(len(ordered) - 1, -1, -1):
+        rest[i] = rest[i + 1] + ordered[i].value
+    if rest[0] < value:
+        return None
+
+    # 用显式的栈（chosen）代替递归，递归深度会随 UTXO 个数增长
+    chosen = []  # type: List[int]
+    remain = value
+    i = 0
+    for _ in range(BNB_MAX_TRIES):
+        if remain == 0:
+            return [ordered[k] for k in chosen]
+        if i < len(ordered) and rest[i] >= remain and len(chosen) < MAX_INPUTS:
+            # 能选则选，否则跳过当前 UTXO
+            if ordered[i].value <= remain:
+                chosen.append(i)
+                remain -= ordered[i].value
+            i += 1
+            continue
+        # 剪枝：回溯到最近选入的 UTXO，改为不选它
+        if not chosen:
+            return None
+        k = chosen.pop()
+        remain += ordered[k].value
+        i = k + 1
+    return None
+
+
+def select_consolidate(coins: List[Coin], value: int) -> Optional[List[Coin]]:
+    """
+    合并模式：从小到大尽量多地花掉零碎的 UTXO（最多 MAX_INPUTS 个），找零合并成一个输出。
+
+    :param coins: 可用的 UTXO
+    :param value: 需要的金额
+    :return: 选中的 UTXO，金额不足时为 None
+    """
+    ordered = sorted(coins, key=lambda each: each.value)
+    if len(ordered) > MAX_INPUTS:
+        # 先保证金额足够，再用最小的 UTXO 填满剩余的输入数
+        needed = select_largest_first(ordered, value)
+        if needed is None:
+            return None
+        picked = set(id(each) for each in needed)
+        for each in ordered:
+            if len(needed) >= MAX_INPUTS:
+                break
+            if id(each) not in picked:
+                needed.append(each)
+        return needed
+    if sum(each.value for each in ordered) < value:
+        return None
+    return ordered
+
+
+def select_auto(coins: List[Coin], value: int) -> Optional[List[Coin]]:
+    """
+    默认策略：先尝试不需要找零的精确组合，找不到时按金额从大到小选取。
+
+    :param coins: 可用的 UTXO
+    :param value: 需要的金额
+    :return: 选中的 UTXO，金额不足时为 None
+    """
+    return select_branch_and_bound(coins, value) or select_largest_first(coins, value)
+
+
+STRATEGIES = {
+    "auto": select_auto,
+    "first_fit": select_first_fit,
+    "largest_first": select_largest_first,
+    "bnb": select_branch_and_bound,
+    "consolidate": select_consolidate,
+}  # type: Dict[str, Callable[[List[Coin], int], Optional[List[Coin]]]]
+
+
+def select_coins(coins: List[Coin], value: int, strategy: str = "auto") -> Optional[List[Coin]]:
+    """
+    按指定策略选取 UTXO。
+
+    :param coins: 可用的 UTXO，按上链顺序排列
+    :param value: 需要的金额
+    :param strategy: 策略名，见 STRATEGIES
+    :return: 选中的 UTXO，无法满足时为 None
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError("未知的选币策略：" + strategy)
+    return STRATEGIES[strategy](coins, value)
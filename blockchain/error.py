@@ -12,4 +12,14 @@ class AccessDenied(Exception):
 class BlockIsOverFlow(Exception):
     def __init__(self):
         logging.warning("交易已达上限，需要更多的区块。")
-        pass
\ No newline at end of file
+        pass
+
+class DoubleSpend(Exception):
+    def __init__(self):
+        logging.warning("交易引用的 UTXO 已被内存池中的其他交易花费。")
+        pass
+
+class InvalidTransaction(Exception):
+    def __init__(self, reason: str = ""):
+        logging.warning("交易无效：" + reason)
+        super().__init__(reason)
\ No newline at end of file
@@ -0,0 +1,238 @@
+# -*- coding:utf-8 -*-
+import heapq
+import itertools
+import logging
+import threading
+from typing import Dict, List, Optional
+from blockchain import error
+from blockchain.block import Block, Blockchain
+from blockchain.codec import encode_transaction
+from blockchain.transaction import Transaction, verify_inputs
+from blockchain.utxo import OutPoint
+
+# 每个区块最多容纳的交易数（含 coinbase），与 make_deal 中的限制一致
+BLOCK_CAPACITY = 10
+
+
+class MempoolEntry(object):
+    """
+    内存池中的一条交易，以及计算优先级所需的信息。
+    """
+    __slots__ = ("transaction", "serial", "size", "coins")
+
+    def __init__(self, transaction: Transaction, serial: int, coins: List[tuple]) -> None:
+        """
+        :param transaction: 交易
+        :param serial: 进入内存池的序号，优先级相同时先到先得
+        :param coins: 各输入引用的 UTXO 的 (金额, 所在区块下标)
+        """
+        self.transaction = transaction
+        self.serial = serial
+        buf = bytearray()
+        encode_transaction(buf, transaction)
+        self.size = len(buf)
+        self.coins = coins
+
+    def priority(self, height: int) -> float:
+        """
+        币龄优先级：各输入金额乘以其确认数之和，除以交易编码后的字节数。
+
+        :param height: 下一个区块的下标
+        :return: 优先级，越大越先打包
+        """
+        return sum(value * (height - coin_height) for value, coin_height in self.coins) / self.size
+
+
+class Mempool(object):
+    """
+    内存池：接收验证过的交易，等待打包进区块。
+
+    交易的提交与出块互不影响：提交时只验证并记录，出块时按优先级取出最多 capacity - 1 条交易，
+    与 coinbase 一起组成新区块。可以随时调用 assemble 出块，也可以用 start 定时出块。
+
+    内存池只接受花费已上链 UTXO 的交易，并记录每个输出点被哪条交易花费，拒绝冲突的交易。
+
+    可在多个线程中同时提交交易。需要同时加锁时，总是先取区块链的锁，再取内存池的锁。
+    """
+
+    def __init__(self, blockchain: Blockchain, capacity: int = BLOCK_CAPACITY) -> None:
+        """
+        :param blockchain: 区块链
+        :param capacity: 每个区块最多容纳的交易数（含 coinbase）
+        """
+        self.blockchain = blockchain
+        self.capacity = capacity
+        self._entries = {}  # type: Dict[str, MempoolEntry]
+        self._spent = {}  # type: Dict[OutPoint, str]
+        self._serial = itertools.count()
+        self._lock = threading.RLock()
+        self._stop = None  # type: Optional[threading.Event]
+        self._thread = None  # type: Optional[threading.Thread]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, tx_hash: str) -> bool:
+        return tx_hash in self._entries
+
+    def is_spent(self, outpoint: OutPoint) -> bool:
+        """
+        :param outpoint: 输出点
+        :return: 已被内存池中的交易花费时为 True
+        """
+        return outpoint in self._spent
+
+    def add(self, transaction: Transaction) -> None:
+        """
+        验证交易并加入内存池。
+
+        检查各输入引用的 UTXO 存在、金额与锁定脚本一致、公匙对应锁定地址、没有被内存池中的交易花费，
+        输入输出金额相等，最后用 ECDSA.verify_many 验证签名。
+
+        :param transaction: 已 seal 的交易
+        """
+        with self.blockchain.lock.read():
+            if not transaction.inList:
+                raise error.InvalidTransaction("交易没有输入")
+            if any(each.value <= 0 for each in transaction.outList):
+                raise error.InvalidTransaction("输出金额必须为正数")
+            utxo = self.blockchain.utxo
+            coins = []
+            for each in transaction.inList:
+                coin = utxo.get(each.outpoint)
+                if coin is None:
+                    raise error.InvalidTransaction("引用的 UTXO 不存在或已花费")
+                if coin.value != each.utxo or coin.address != each.preScript:
+                    raise error.InvalidTransaction("输入与引用的 UTXO 不一致")
+                if not each.unlocks():
+                    raise error.AccessDenied()
+                coins.append((coin.value, coin.height))
+            if len(set(each.outpoint for each in transaction.inList)) != len(transaction.inList):
+                raise error.InvalidTransaction("交易重复引用同一个 UTXO")
+            if sum(value for value, _ in coins) != sum(each.value for each in transaction.outList):
+                raise error.InvalidTransaction("输入与输出金额不相等")
+            if not all(verify_inputs(transaction.inList)):
+                raise error.AccessDenied()
+            with self._lock:
+                if transaction.hash in self._entries:
+                    return
+                if any(each.outpoint in self._spent for each in transaction.inList):
+                    raise error.DoubleSpend()
+                self._entries[transaction.hash] = MempoolEntry(transaction, next(self._serial), coins)
+                for each in transaction.inList:
+                    self._spent[each.outpoint] = transaction.hash
+        logging.debug("交易(hash='" + transaction.hash + "')进入内存池，当前共 " + str(len(self._entries)) + " 条。")
+
+    def remove(self, tx_hash: str) -> Optional[Transaction]:
+        """
+        从内存池中移除交易。
+
+        :param tx_hash: 交易哈希
+        :return: 被移除的交易，不存在时为 None
+        """
+        with self._lock:
+            entry = self._entries.pop(tx_hash, None)
+            if entry is None:
+                return None
+            for each in entry.transaction.inList:
+                if self._spent.get(each.outpoint) == tx_hash:
+                    del self._spent[each.outpoint]
+            return entry.transaction
+
+    def prune(self) -> int:
+        """
+        移除已上链或与链上交易冲突的交易，即引用的 UTXO 已不在 UTXO 索引中的交易。
+
+        区块不经过 assemble 加入区块链后应调用一次。
+
+        :return: 移除的交易数
+        """
+        utxo = self.blockchain.utxo
+        with self.blockchain.lock.read(), self._lock:
+            stale = [tx_hash for tx_hash, entry in self._entries.items()
+                     if any(each.outpoint not in utxo for each in entry.transaction.inList)]
+            for tx_hash in stale:
+                self.remove(tx_hash)
+        return len(stale)
+
+    def select(self, limit: int) -> List[Transaction]:
+        """
+        按优先级从高到低取出最多 limit 条交易，不从内存池中移除。
+
+        :param limit: 最多取出的交易数
+        :return: 交易列表
+        """
+        with self.blockchain.lock.read(), self._lock:
+            height = len(self.blockchain.blockList)
+            best = heapq.nsmallest(limit, self._entries.values(),
+                                   key=lambda entry: (-entry.priority(height), entry.serial))
+        return [entry.transaction for entry in best]
+
+    def assemble(self, miner_address: str) -> Optional[Block]:
+        """
+        取出优先级最高的交易组成新区块，挖矿并加入区块链，打包的交易从内存池中移除。
+
+        只在选取交易和加入区块时持有锁，挖矿期间提交交易与查询照常进行。
+        挖矿期间最后一个区块变化或选中的交易被移除时，重新选取交易并挖矿。
+
+        :param miner_address: 矿工地址
+        :return: 新区块，内存池为空时为 None
+        """
+        while True:
+            pre = self.blockchain.seal_tip()
+            with self.blockchain.lock.read(), self._lock:
+                if self.blockchain.tip() != pre:
+                    continue
+                self.prune()
+                chosen = self.select(self.capacity - 1)
+                if not chosen:
+                    return None
+                block = Block(miner_address)
+                block.data.extend(chosen)
+                block.set_merkle_hash()
+                block.set_block_hash()
+            self.blockchain.seal(block, pre)
+            with self.blockchain.lock.write(), self._lock:
+                if any(tx.hash not in self._entries for tx in chosen) or not self.blockchain.append(block, pre):
+                    logging.debug("挖矿期间区块链或内存池已变化，重新选取交易。")
+                    continue
+                for tx in chosen:
+                    entry = self._entries[tx.hash]
+                    for each, (_, coin_height) in zip(tx.inList, entry.coins):
+                        self.blockchain.get_transaction(coin_height, each.preHash).outList[each.index].isUsed = True
+                    self.remove(tx.hash)
+            break
+        logging.debug("已将 " + str(len(chosen)) + " 条交易打包进新区块(BlockHash='" + block.blockHash + "')。")
+        return block
+
+    def start(self, miner_address: str, interval: float = 10.0) -> None:
+        """
+        启动后台线程，每隔 interval 秒将内存池中的交易打包出块，内存池为空时不出块。
+
+        :param miner_address: 矿工地址
+        :param interval: 出块间隔（秒）
+        """
+        if self._thread is not None:
+            raise RuntimeError("定时出块已经启动")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(miner_address, interval, self._stop),
+                                        name="mempool-assembler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        停止定时出块，等待正在进行的出块完成。
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._stop = None
+
+    def _run(self, miner_address: str, interval: float, stop: threading.Event) -> None:
+        while not stop.wait(interval):
+            try:
+                self.assemble(miner_address)
+            except Exception:
+                logging.exception("定时出块失败。")
@@ -0,0 +1,133 @@
+# -*- coding:utf-8 -*-
+from typing import List, Tuple
+from utils.sha256 import my_sha256
+
+
+def merkle_parent(left: str, right: str) -> str:
+    """
+    计算两个相邻节点的父节点。
+
+    :param left: 左节点哈希
+    :param right: 右节点哈希
+    :return: 父节点哈希
+    """
+    return my_sha256(left + right)
+
+
+def merkle_lone_parent(node: str) -> str:
+    """
+    计算某层落单的最后一个节点的父节点：与自身拼接后做两次哈希。
+
+    :param node: 落单的节点哈希
+    :return: 父节点哈希
+    """
+    return my_sha256(my_sha256(node + node))
+
+
+# Merkle 证明中每一步的类型：兄弟节点在左、在右，或当前节点落单与自身拼接
+PROOF_LEFT = "L"
+PROOF_RIGHT = "R"
+PROOF_LONE = "D"
+
+
+def verify_merkle_proof(leaf: str, proof: List[Tuple[str, str]], root: str) -> bool:
+    """
+    轻客户端验证：沿证明路径从叶子向上计算，检查结果是否等于 Merkle 根，只需 O(log n) 次哈希。
+
+    :param leaf: 叶子哈希，即交易哈希
+    :param proof: MerkleTree.proof 或 Block.merkle_proof 给出的路径
+    :param root: 区块头中的 Merkle 根
+    :return: 叶子在树中时为 True
+    """
+    node = leaf
+    for side, sibling in proof:
+        if side == PROOF_LEFT:
+            node = merkle_parent(sibling, node)
+        elif side == PROOF_RIGHT:
+            node = merkle_parent(node, sibling)
+        elif side == PROOF_LONE:
+            node = merkle_lone_parent(node)
+        else:
+            return False
+    return node == root
+
+
+class MerkleTree(object):
+    """
+    保留全部中间层的 Merkle 树，支持追加叶子时只更新受影响的路径。
+
+    levels[0] 为叶子层，最后一层只有一个节点，即 Merkle 根。
+    """
+
+    def __init__(self, leaves: List[str]) -> None:
+        """
+        由叶子逐层构建整棵树。
+
+        :param leaves: 叶子节点哈希，即各交易哈希
+        """
+        self.levels = [list(leaves)]  # type: List[List[str]]
+        cur = self.levels[0]
+        while len(cur) > 1:
+            nxt = []
+            for i in range(0, len(cur) - 1, 2):
+                nxt.append(merkle_parent(cur[i], cur[i + 1]))
+            if len(cur) % 2 == 1:
+                nxt.append(merkle_lone_parent(cur[-1]))
+            self.levels.append(nxt)
+            cur = nxt
+
+    @property
+    def root(self) -> str:
+        """
+        :return: Merkle 根，没有叶子时为空字符串
+        """
+        return self.levels[-1][0] if self.levels[-1] else ""
+
+    def append(self, leaf: str) -> str:
+        """
+        追加一个叶子，每层只重新计算最后一个节点的父节点，共 O(log n) 次哈希。
+
+        :param leaf: 新叶子哈希
+        :return: 新的 Merkle 根
+        """
+        self.levels[0].append(leaf)
+        i = 0
+        while len(self.levels[i]) > 1:
+            cur = self.levels[i]
+            last = len(cur) - 1
+            if last % 2 == 1:
+                node = merkle_parent(cur[last - 1], cur[last])
+            else:
+                node = merkle_lone_parent(cur[last])
+            if i + 1 == len(self.levels):
+                self.levels.append([])
+            nxt = self.levels[i + 1]
+            if last // 2 < len(nxt):
+                nxt[last // 2] = node
+            else:
+                nxt.append(node)
+            i += 1
+        return self.root
+
+    def proof(self, index: int) -> List[Tuple[str, str]]:
+        """
+        生成第 index 个叶子的包含证明：自底向上每层一步 (类型, 兄弟节点哈希)。
+
+        类型为 PROOF_LEFT / PROOF_RIGHT 时兄弟节点分别在左 / 右；
+        为 PROOF_LONE 时当前节点落单，兄弟节点为空字符串。
+
+        :param index: 叶子下标
+        :return: 证明路径
+        """
+        if not 0 <= index < len(self.levels[0]):
+            raise IndexError("叶子下标越界")
+        path = []
+        for cur in self.levels[:-1]:
+            if index % 2 == 1:
+                path.append((PROOF_LEFT, cur[index - 1]))
+            elif index == len(cur) - 1:
+                path.append((PROOF_LONE, ""))
+            else:
+                path.append((PROOF_RIGHT, cur[index + 1]))
+            index //= 2
+        return path
@@ -0,0 +1,220 @@
+# -*- coding:utf-8 -*-
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import multiprocessing
+from threading import Event
+from typing import Optional, Tuple
+from utils.sha256 import Sha256
+
+# 默认难度：区块哈希需要的前导 0 比特数
+DEFAULT_DIFFICULTY = 8
+
+
+def target_from_difficulty(difficulty: int) -> int:
+    """
+    由难度（前导 0 比特数）计算目标值，区块哈希不超过目标值即为有效。
+
+    :param difficulty: 前导 0 比特数，0 ~ 256
+    :return: 目标值
+    """
+    if not 0 <= difficulty <= 256:
+        raise ValueError("难度需在 0 ~ 256 之间")
+    return (1 << (256 - difficulty)) - 1
+
+
+def meets_target(block_hash: str, target: int) -> bool:
+    """
+    判断区块哈希是否满足目标值。
+
+    :param block_hash: 十六进制区块哈希
+    :param target: 目标值
+    :return: 满足为 True
+    """
+    return int(block_hash, 16) <= target
+
+
+class MiningStats(object):
+    """
+    一次挖矿的统计信息。
+    """
+
+    def __init__(self, found: bool, nonce: int, attempts: int, seconds: float, workers: int = 1) -> None:
+        """
+        :param found: 是否找到满足目标值的 nonce
+        :param nonce: 找到的 nonce，未找到时为最后尝试的 nonce
+        :param attempts: 尝试次数，多进程时为所有进程之和
+        :param seconds: 耗时（秒），多进程时为墙上时间
+        :param workers: 参与挖矿的进程数
+        """
+        self.found = found
+        self.nonce = nonce
+        self.attempts = attempts
+        self.seconds = seconds
+        self.workers = workers
+
+    @property
+    def hash_rate(self) -> float:
+        """
+        :return: 每秒哈希次数
+        """
+        return self.attempts / self.seconds if self.seconds > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return "MiningStats(found={}, nonce={}, attempts={}, seconds={:.3f}, hash_rate={:.0f}/s, workers={})".format(
+            self.found, self.nonce, self.attempts, self.seconds, self.hash_rate, self.workers)
+
+
+def mine(block: "Block", target: int, start_nonce: int = 0, max_attempts: Optional[int] = None) -> MiningStats:
+    """
+    工作量证明：从 start_nonce 开始递增 nonce，直到区块哈希不超过目标值。
+
+    区块头的固定前缀只哈希一次，之后每次尝试从 midstate 出发只处理 nonce 所在的最后一两个分组。
+    找到后写回区块的 nonce、blockHash 与 target。
+
+    :param block: type=Block，待挖的区块
+    :param target: 目标值
+    :param start_nonce: 起始 nonce
+    :param max_attempts: 最多尝试次数，None 表示不限
+    :return: 挖矿统计信息
+    """
+    midstate = block.header_midstate()
+    digest_with = midstate.hexdigest_with
+    nonce = start_nonce
+    attempts = 0
+    start = time.perf_counter()
+    while max_attempts is None or attempts < max_attempts:
+        attempts += 1
+        block_hash = digest_with(str(nonce).encode())
+        if int(block_hash, 16) <= target:
+            block.midstate = midstate
+            block.nonce = nonce
+            block.blockHash = block_hash
+            block.target = target
+            block.dirty = False
+            stats = MiningStats(True, nonce, attempts, time.perf_counter() - start)
+            logging.debug("挖矿成功：" + repr(stats))
+            return stats
+        nonce += 1
+    return MiningStats(False, nonce - 1, attempts, time.perf_counter() - start)
+
+
+def search_nonce(midstate: Sha256, target: int, start: int, step: int, stop: Event,
+                 check_every: int = 1000, max_attempts: Optional[int] = None) -> Tuple[bool, int, str, int]:
+    """
+    子进程中的 nonce 搜索：依次尝试 start, start + step, start + 2 * step, ...
+
+    每 check_every 次尝试检查一次 stop，其他进程找到结果后会设置 stop，本进程随即退出。
+
+    :param midstate: 区块头前缀的 midstate
+    :param target: 目标值
+    :param start: 起始 nonce
+    :param step: nonce 步长，即进程数
+    :param stop: 进程间共享的停止标志
+    :param check_every: 检查停止标志的间隔
+    :param max_attempts: 本进程最多尝试次数，None 表示不限
+    :return: (是否找到, nonce, 区块哈希, 尝试次数)
+    """
+    digest_with = midstate.hexdigest_with
+    nonce = start
+    attempts = 0
+    while max_attempts is None or attempts < max_attempts:
+        if attempts % check_every == 0 and stop.is_set():
+            break
+        attempts += 1
+        block_hash = digest_with(str(nonce).encode())
+        if int(block_hash, 16) <= target:
+            stop.set()
+            return True, nonce, block_hash, attempts
+        nonce += step
+    return False, nonce, "", attempts
+
+
+# 挖矿进程中的停止标志，由 MiningPool 创建进程时传入
+_worker_stop = None  # type: Optional[Event]
+
+
+def _init_worker(stop: Event) -> None:
+    global _worker_stop
+    _worker_stop = stop
+
+
+def _search_in_pool(midstate: Sha256, target: int, start: int, step: int,
+                    max_attempts: Optional[int]) -> Tuple[bool, int, str, int]:
+    return search_nonce(midstate, target, start, step, _worker_stop, max_attempts=max_attempts)
+
+
+class MiningPool(object):
+    """
+    可复用的挖矿进程池。进程与停止标志只在创建时启动一次，之后每次挖矿直接分发任务，
+    省去每个区块重新启动进程的开销。
+
+    同一时刻只能进行一次挖矿，多个线程共用时由调用者加锁。
+    """
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        """
+        :param workers: 进程数，默认为 CPU 核数
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.stop = multiprocessing.Event()
+        self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.stop,))
+
+    def shutdown(self) -> None:
+        """
+        关闭进程池。
+        """
+        self.executor.shutdown(wait=True)
+
+
+def mine_parallel(block: "Block", target: int, workers: Optional[int] = None,
+                  max_attempts: Optional[int] = None, pool: Optional[MiningPool] = None) -> MiningStats:
+    """
+    多进程工作量证明：第 i 个进程尝试 nonce = i, i + workers, i + 2 * workers, ...
+
+    区块头前缀的 midstate 在主进程算好后发给各进程。任一进程找到结果即设置共享停止标志，
+    其他进程在下一次检查时退出。返回的尝试次数为所有进程之和，哈希速率为总速率。
+
+    给出 pool 时使用其中已经启动的进程，workers 取 pool 的进程数；否则临时创建一个进程池，挖完即关闭。
+
+    :param block: type=Block，待挖的区块
+    :param target: 目标值
+    :param workers: 进程数，默认为 CPU 核数
+    :param max_attempts: 所有进程合计最多尝试次数，None 表示不限
+    :param pool: 可复用的挖矿进程池
+    :return: 挖矿统计信息
+    """
+    if pool is None:
+        pool = MiningPool(workers)
+        try:
+            return mine_parallel(block, target, max_attempts=max_attempts, pool=pool)
+        finally:
+            pool.shutdown()
+    workers = pool.workers
+    midstate = block.header_midstate()
+    per_worker = None if max_attempts is None else (max_attempts + workers - 1) // workers
+    start = time.perf_counter()
+    pool.stop.clear()
+    pending = {pool.executor.submit(_search_in_pool, midstate, target, i, workers, per_worker)
+               for i in range(workers)}
+    results = []
+    # 等待全部进程退出，下次挖矿清除停止标志时不会有进程仍在搜索
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        results.extend(each.result() for each in done)
+    seconds = time.perf_counter() - start
+
+    attempts = sum(each[3] for each in results)
+    winners = [each for each in results if each[0]]
+    if not winners:
+        return MiningStats(False, max(each[1] for each in results), attempts, seconds, workers)
+    _, nonce, block_hash, _ = min(winners, key=lambda each: each[1])
+    block.midstate = midstate
+    block.nonce = nonce
+    block.blockHash = block_hash
+    block.target = target
+    block.dirty = False
+    stats = MiningStats(True, nonce, attempts, seconds, workers)
+    logging.debug("多进程挖矿成功：" + repr(stats))
+    return stats
@@ -0,0 +1,183 @@
+# -*- coding:utf-8 -*-
+import json
+import os
+import struct
+import sys
+from array import array
+from typing import Callable, Iterator, List, Optional, Tuple
+from blockchain.utxo import Coin, UtxoSet
+
+# 文件头：8 字节魔数 + 1 字节格式版本 + 7 字节保留
+DATA_MAGIC = b"CCOINDAT"
+INDEX_MAGIC = b"CCOININD"
+FORMAT_VERSION = 3
+HEADER_SIZE = 16
+# 区块记录：4 字节长度 + blockchain.codec 编码的区块
+RECORD_HEADER = struct.Struct("<I")
+
+DATA_FILE = "blocks.dat"
+INDEX_FILE = "blocks.idx"
+UTXO_FILE = "utxo.json"
+
+
+class BlockStore(object):
+    """
+    磁盘上的区块存储，位于一个目录中：
+
+        blocks.dat：只追加的区块记录，每条为 4 字节长度加编码后的区块
+
+        blocks.idx：定长索引，第 i 项为第 i 个区块最新一条记录在 blocks.dat 中的偏移（8 字节）
+
+        utxo.json：UTXO 索引快照，打开时若与区块数一致则直接载入，无需重放整条链
+
+    区块内容变化（例如最后一个区块新增交易）时追加一条新记录，并改写索引中的偏移，旧记录不再被引用。
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        打开或创建存储目录。
+
+        :param path: 目录路径
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self._data = self._open(os.path.join(path, DATA_FILE), DATA_MAGIC)
+        self._index = self._open(os.path.join(path, INDEX_FILE), INDEX_MAGIC)
+        self._index.seek(HEADER_SIZE)
+        self.offsets = array("Q")
+        self.offsets.frombytes(self._index.read())
+        if sys.byteorder == "big":
+            self.offsets.byteswap()
+
+    @classmethod
+    def _open(cls, file_name: str, magic: bytes):
+        """
+        打开文件并检查文件头，文件不存在时创建并写入文件头。
+        """
+        if not os.path.exists(file_name):
+            with open(file_name, "wb") as f:
+                f.write(magic + bytes([FORMAT_VERSION]) + b"\x00" * 7)
+        f = open(file_name, "r+b")
+        header = f.read(HEADER_SIZE)
+        if header[:8] != magic or header[8] != FORMAT_VERSION:
+            f.close()
+            raise ValueError("无法识别的存储文件：" + file_name)
+        return f
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def read(self, height: int) -> bytes:
+        """
+        读取第 height 个区块的编码。
+
+        :param height: 区块下标
+        :return: 编码后的区块
+        """
+        self._data.seek(self.offsets[height])
+        size, = RECORD_HEADER.unpack(self._data.read(RECORD_HEADER.size))
+        return self._data.read(size)
+
+    def write(self, height: int, payload: bytes) -> None:
+        """
+        在数据文件末尾追加区块记录，并更新索引。
+
+        :param height: 区块下标，只能是已有区块或紧接着的下一个
+        :param payload: 编码后的区块
+        """
+        if height > len(self.offsets):
+            raise IndexError("区块必须按顺序写入")
+        self._data.seek(0, os.SEEK_END)
+        offset = self._data.tell()
+        self._data.write(RECORD_HEADER.pack(len(payload)) + payload)
+        self._index.seek(HEADER_SIZE + 8 * height)
+        self._index.write(struct.pack("<Q", offset))
+        if height == len(self.offsets):
+            self.offsets.append(offset)
+        else:
+            self.offsets[height] = offset
+
+    def save_utxo(self, utxo: UtxoSet) -> None:
+        """
+        写入 UTXO 索引快照，先写临时文件再替换，避免写到一半的快照。
+
+        :param utxo: UTXO 索引
+        """
+        coins = [[each.tx_hash, each.index, each.value, each.address, each.height] for each in utxo.coins()]
+        file_name = os.path.join(self.path, UTXO_FILE)
+        with open(file_name + ".tmp", "w") as f:
+            json.dump({"blocks": len(self.offsets), "coins": coins}, f, separators=(",", ":"))
+        os.replace(file_name + ".tmp", file_name)
+
+    def load_utxo(self) -> Optional[UtxoSet]:
+        """
+        载入 UTXO 索引快照。
+
+        :return: UTXO 索引，快照不存在或与区块数不一致时为 None
+        """
+        file_name = os.path.join(self.path, UTXO_FILE)
+        if not os.path.exists(file_name):
+            return None
+        with open(file_name) as f:
+            snapshot = json.load(f)
+        if snapshot["blocks"] != len(self.offsets):
+            return None
+        utxo = UtxoSet()
+        for tx_hash, index, value, address, height in snapshot["coins"]:
+            utxo.add(Coin(tx_hash, index, value, address, height))
+        return utxo
+
+    def flush(self) -> None:
+        """
+        将缓冲区写入磁盘。
+        """
+        self._data.flush()
+        self._index.flush()
+        os.fsync(self._data.fileno())
+        os.fsync(self._index.fileno())
+
+    def close(self) -> None:
+        self._data.close()
+        self._index.close()
+
+
+class LazyBlockList(object):
+    """
+    按需载入的区块列表，用法与 list 相同。第一次访问某个区块时才读取并解码，之后缓存在内存中。
+    """
+
+    def __init__(self, count: int, loader: Callable[[int], "Block"]) -> None:
+        """
+        :param count: 磁盘上的区块数
+        :param loader: 由下标读取并解码区块的函数
+        """
+        self._blocks = [None] * count  # type: List[Optional[Block]]
+        self._loader = loader
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self._blocks)))]
+        if item < 0:
+            item += len(self._blocks)
+        block = self._blocks[item]
+        if block is None:
+            block = self._blocks[item] = self._loader(item)
+        return block
+
+    def __iter__(self) -> Iterator["Block"]:
+        for i in range(len(self._blocks)):
+            yield self[i]
+
+    def append(self, block: "Block") -> None:
+        self._blocks.append(block)
+
+    def loaded(self) -> Iterator[Tuple[int, "Block"]]:
+        """
+        :return: 已在内存中的 (下标, 区块)
+        """
+        for i, block in enumerate(self._blocks):
+            if block is not None:
+                yield i, block
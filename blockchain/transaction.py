@@ -1,47 +1,112 @@
 # -*- coding:utf-8 -*-
 from utils.ecdsa import ECDSA
+from utils.keycache import key_cache
 from utils.sha256 import my_sha256
-import error
-from typing import List
+from blockchain import error
+from blockchain.coinselect import select_coins
+from functools import lru_cache
+from typing import List, Tuple
+
+# 每个区块 coinbase 交易的挖矿所得
+COINBASE_REWARD = 50
 
 
 class In(object):
     """
     交易类中的输入类。主体是解锁脚本，解锁 UTXO。
+
+    只以输出点（交易哈希与下标）引用上一个输出，不持有上一个交易与发起人对象。
     """
+    __slots__ = ("preHashBytes", "index", "preScript", "script", "utxo")
+
     def __init__(self, preOut, index, sender) -> None:
         """
-        生成一个输出类。
+        生成一个输入类，并用发起人的私匙签名。
 
-        :param preOut: 引用的上一个交易的哈希
-        :param index:
-        :param sender:
+        :param preOut: 引用的上一个交易
+        :param index: 引用的输出在上一个交易中的下标
+        :param sender: 发起人
         """
-        # preOut 为引用的上一个交易哈希， preUTXO是维护余额
-        # 该输入的原输出的地址
-        self.sender = sender
-        self.preOut = preOut
+        # 引用输出的交易哈希（32 字节）、下标与锁定脚本
+        self.preHashBytes = preOut.hashBytes
         self.index = index
-        # 解锁脚本
-        private_key = ECDSA.get_private_key_from_wif(sender.wif)
-        public_key = ECDSA.get_public_key_from_private_key(private_key)
-        self.script = [ECDSA.gen_signature(preOut.outList[index].script, int(private_key, 16)), public_key]
+        self.preScript = preOut.outList[index].script
+        # 解锁脚本：(签名, 公匙)
+        key = key_cache.from_wif(sender.wif)
+        self.script = (ECDSA.gen_signature(self.preScript, int(key.private_key, 16)), key.public_key)
         # 维护的UTXO数据
         self.utxo = preOut.outList[index].value
 
+    @property
+    def preHash(self) -> str:
+        """
+        :return: 引用的交易哈希，十六进制
+        """
+        return self.preHashBytes.hex()
+
+    @property
+    def outpoint(self) -> Tuple[str, int]:
+        """
+        :return: 引用的输出点 (交易哈希, 下标)
+        """
+        return self.preHashBytes.hex(), self.index
+
     def to_string(self) -> str:
-        string = self.preOut.hash
+        # preScript 与 utxo 由校验时查找引用的输出核对，不参与哈希；下标决定引用哪个输出，必须参与
+        string = self.preHash + str(self.index)
         string += str(self.script[0][0]) + str(self.script[0][1]) + str(self.script[1][0]) + str(self.script[1][1])
         return string
 
+    def signature_item(self) -> Tuple[str, Tuple[int, int], Tuple[int, int]]:
+        """
+        返回验证该输入所需的 (信息, 公匙, 签名)，可直接交给 ECDSA.verify_many。
+
+        公匙取自解锁脚本，不需要发起人的私匙，从磁盘载入的交易同样可以验证。
+        签名只能说明输入由该公匙签发，公匙是否有权花费引用的输出由 unlocks 检查，见 verify_inputs。
+
+        :return: 待验证的三元组
+        """
+        return self.preScript, self.script[1], self.script[0]
+
+    def unlocks(self) -> bool:
+        """
+        解锁脚本中的公匙是否对应引用输出的锁定地址，即发起人是否有权花费该输出。
+
+        :return: 公匙生成的地址等于 preScript 时为 True
+        """
+        return address_of(self.script[1]) == self.preScript
+
     def verify(self) -> bool:
         """
-        验证消息是否通过。
+        验证消息是否通过：公匙对应锁定地址，且签名有效。
 
         :return: 消息通过为 true
         """
-        public_key = ECDSA.get_public_key_from_private_key(self.sender.wif, True)
-        return ECDSA.verify_signature(self.preOut.outList[self.index].script, public_key, self.script[0])
+        return self.unlocks() and ECDSA.verify_signature(*self.signature_item())
+
+
+@lru_cache(maxsize=4096)
+def address_of(public_key: Tuple[int, int]) -> str:
+    """
+    由未压缩公匙生成地址。同一用户的各个输入使用同一个公匙，结果缓存起来。
+
+    :param public_key: 未压缩公匙
+    :return: 地址
+    """
+    return ECDSA.get_address_from_compressed_public_key(ECDSA.get_compressed_public_key_from_public_key(public_key))
+
+
+def verify_inputs(inputs: List[In]) -> List[bool]:
+    """
+    验证一组输入：公匙对应引用输出的锁定地址（见 In.unlocks），且签名有效。签名用 ECDSA.verify_many 逐项验证。
+
+    所有验证输入的地方都应使用它，而不是只验证签名，否则可以用自己的密匙花费别人的输出。
+
+    :param inputs: 输入列表
+    :return: 与 inputs 对应的验证结果
+    """
+    signed = ECDSA.verify_many([each.signature_item() for each in inputs])
+    return [ok and each.unlocks() for each, ok in zip(inputs, signed)]
 
 
 class Out(object):
@@ -49,6 +114,8 @@ class Out(object):
     交易类中的输出类，主体是锁定脚本。
     """
 
+    __slots__ = ("value", "index", "script", "isUsed")
+
     def __init__(self, value: int, address: str) -> None:
         # 交易数额
         self.value = value
@@ -65,24 +132,49 @@ class Out(object):
 
 class Transaction(object):
     """
-    单条交易信息。
+    单条交易信息。交易哈希以 32 字节保存在 hashBytes 中，hash 为其十六进制形式。
     """
+    __slots__ = ("inList", "outList", "extra", "hashBytes")
 
-    def __init__(self) -> None:
+    def __init__(self, extra: str = "") -> None:
+        """
+        :param extra: 附加数据，参与哈希。coinbase 交易用它区分同一矿工的多次挖矿所得，普通交易为空
+        """
         self.inList = []  # type: List[In]
         self.outList = []  # type: List[Out]
-        self.hash = ""
+        self.extra = extra
+        self.hashBytes = b""
 
-    def compute_hash(self) -> None:
+    @property
+    def hash(self) -> str:
         """
-        计算单条交易信息的 Hash。
+        :return: 交易哈希，十六进制，尚未计算时为空字符串
+        """
+        return self.hashBytes.hex()
+
+    @hash.setter
+    def hash(self, value: str) -> None:
+        self.hashBytes = bytes.fromhex(value)
+
+    def digest(self) -> bytes:
+        """
+        由交易内容计算 Hash，不修改 hashBytes。
+
+        :return: 32 字节哈希
         """
         string = ""
         for each in self.inList:
             string += each.to_string()
         for each in self.outList:
             string += each.to_string()
-        self.hash = my_sha256(string)
+        string += self.extra
+        return bytes.fromhex(my_sha256(string))
+
+    def compute_hash(self) -> None:
+        """
+        计算单条交易信息的 Hash。
+        """
+        self.hashBytes = self.digest()
 
     def add_input(self, new) -> None:
         """
@@ -105,62 +197,66 @@ class Transaction(object):
         self.compute_hash()
 
 
-def make_deal(sender: "User", receiver_address: str, value: int, blockchain: "Blockchain") -> None:
+def make_deal(sender: "User", receiver_address: str, value: int, blockchain: "Blockchain",
+              strategy: str = "auto", mempool: "Mempool" = None) -> Transaction:
     """
     构建交易，包含找零过程。
 
     :param sender: type=User，发起人
     :param receiver_address: 接收人地址
-    :param value: 交易金额
+    :param value: 交易金额，必须为正数
     :param blockchain: type=Blockchain，区块链
+    :param strategy: 选币策略，见 blockchain.coinselect.STRATEGIES
+    :param mempool: type=Mempool，内存池。给出时交易提交到内存池等待打包，不写入最后一个区块，
+                    也不受区块容量限制；已被内存池中的交易花费的 UTXO 不会被选中
+    :return: 构建好的交易
+
+    直接写入最后一个区块时持有区块链的写锁；提交到内存池时只持有读锁，可与其他查询同时进行。
     """
-    # 首先，如果最后一个区块已满，则要求创建新区块
-    # 这里设定区块中可以容纳 10 条交易，若超过
-    if len(blockchain.blockList[-1].data) == 10:
-        raise error.BlockIsOverFlow()
-
-    # 首先，遍历整个区块链，寻找可用的 UTXO
-    curTot = 0
-    curTransaction = []
-    flag = False
-    for blockIndex, eachBlock in enumerate(blockchain.blockList):
-        if flag:
-            break
-        for transactionIndex, eachTransaction in enumerate(eachBlock.data):
-            if flag:
-                break
-            for outIndex, eachOut in enumerate(eachTransaction.outList):
-                if flag:
-                    break
-                if eachOut.script == sender.address and eachOut.isUsed is False:
-                    curTot += eachOut.value
-                    curTransaction.append([blockIndex, transactionIndex, outIndex])
-                    if curTot >= value:
-                        flag = True
-    # 根据 UXTO 生成交易输入
-    t = Transaction()
-    if not flag:
-        raise error.CoinNotEnough()
-    for each in curTransaction:
-        new = In(blockchain.blockList[each[0]].data[each[1]], each[2], sender)
-        if new.verify():
+    if value <= 0:
+        raise error.InvalidTransaction("交易金额必须为正数")
+    with blockchain.lock.read() if mempool is not None else blockchain.lock.write():
+        # 首先，如果最后一个区块已满，则要求创建新区块
+        # 这里设定区块中可以容纳 10 条交易，若超过
+        if mempool is None and len(blockchain.blockList[-1].data) == 10:
+            raise error.BlockIsOverFlow()
+
+        # 首先，从 UTXO 索引中按策略选取可用的 UTXO
+        coins = blockchain.utxo.unspent(sender.address)
+        if mempool is not None:
+            coins = [coin for coin in coins if not mempool.is_spent(coin.outpoint)]
+        coins = select_coins(coins, value, strategy)
+        # 根据 UXTO 生成交易输入
+        t = Transaction()
+        if not coins:
+            raise error.CoinNotEnough()
+        curTot = sum(coin.value for coin in coins)
+        preOuts = [blockchain.get_transaction(coin.height, coin.tx_hash) for coin in coins]
+        inputs = [In(preOut, coin.index, sender) for preOut, coin in zip(preOuts, coins)]
+        for new in inputs:
             t.add_input(new)
-            blockchain.blockList[each[0]].data[each[1]].outList[each[2]].isUsed = True
-        else:
+        # 构建输出
+        aim = Out(value, receiver_address)
+        # receiver.UTXO += value
+        # 开始找零，金额恰好相等时不生成找零输出
+        t.add_output(aim)
+        if curTot > value:
+            t.add_output(Out(curTot - value, sender.address))
+        t.seal()
+        # 提交到内存池时由内存池验证，打包后再标记已使用
+        if mempool is not None:
+            mempool.add(t)
+            return t
+        if not all(verify_inputs(inputs)):
             raise error.AccessDenied()
-    # 构建输出
-    aim = Out(value, receiver_address)
-    # receiver.UTXO += value
-    # 开始找零
-    returnCoin = Out(curTot - value, sender.address)
-    t.add_output(aim)
-    t.add_output(returnCoin)
-    t.seal()
-    # 将该交易打包入区块中
-    # # 这里设定区块中可以容纳 10 条交易，若超过
-    # if len(blockchain.blockList[-1].data) > 9:
-    #     newBlock = Block(sender.addr)
-    #     newBlock.addTransaction(t)
-    #     blockchain.addBlock(newBlock)
-    # else:
-    blockchain.blockList[-1].add_transaction(t)
+        for preOut, new in zip(preOuts, inputs):
+            preOut.outList[new.index].isUsed = True
+        # 将该交易打包入区块中
+        # # 这里设定区块中可以容纳 10 条交易，若超过
+        # if len(blockchain.blockList[-1].data) > 9:
+        #     newBlock = Block(sender.addr)
+        #     newBlock.addTransaction(t)
+        #     blockchain.addBlock(newBlock)
+        # else:
+        blockchain.blockList[-1].add_transaction(t)
+        return t
@@ -1,5 +1,6 @@
 # -*- coding:utf-8 -*-
 from utils.ecdsa import ECDSA
+from utils.keycache import key_cache
 from blockchain.block import Blockchain
 
 
@@ -12,14 +13,15 @@ class User(object):
         """
         生成新用户，获取用户的私匙、公匙、wif、address 等信息。
 
+        密钥信息来自全局密钥缓存，同一 wif 重复创建用户时不做椭圆曲线运算。
+
         :param input_wif: 压缩私匙 wif
         """
-        self.menu = ECDSA()
         self.wif = input_wif
-        self.private_key = ECDSA.get_private_key_from_wif(self.wif)
-        self.public_key = ECDSA.get_public_key_from_private_key(self.private_key)
-        compressed_public_key = ECDSA.get_compressed_public_key_from_public_key(self.public_key)
-        self.address = self.menu.get_address_from_compressed_public_key(compressed_public_key)
+        key = key_cache.from_wif(self.wif)
+        self.private_key = key.private_key
+        self.public_key = key.public_key
+        self.address = key.address
         # logging.debug("成功创建用户(wif='" + input_wif + "')。")
 
     @classmethod
@@ -40,16 +42,10 @@ class User(object):
     @classmethod
     def get_utxo(cls, address: str, chain: Blockchain) -> int:
         """
-        获取用户 UTXO。
+        获取用户 UTXO，直接查询区块链的 UTXO 索引，不遍历整条链。
 
         :param address: 用户地址
         :param chain: 区块链
         :return: 对应用户 UTXO
         """
-        ans = 0
-        for eachBlock in chain.blockList:
-            for eachTransaction in eachBlock.data:
-                for eachOut in eachTransaction.outList:
-                    if eachOut.script == address and eachOut.isUsed is False:
-                        ans += eachOut.value
-        return ans
+        return chain.utxo.balance(address)
@@ -0,0 +1,128 @@
+# -*- coding:utf-8 -*-
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 输出点：(交易哈希, 输出下标)
+OutPoint = Tuple[str, int]
+
+
+class Coin(object):
+    """
+    一个未花费输出（UTXO）的索引记录。
+    """
+
+    def __init__(self, tx_hash: str, index: int, value: int, address: str, height: int) -> None:
+        """
+        :param tx_hash: 所在交易的哈希
+        :param index: 在交易输出中的下标
+        :param value: 金额
+        :param address: 锁定脚本，即收款地址
+        :param height: 所在区块在链中的下标
+        """
+        self.tx_hash = tx_hash
+        self.index = index
+        self.value = value
+        self.address = address
+        self.height = height
+
+    @property
+    def outpoint(self) -> OutPoint:
+        return self.tx_hash, self.index
+
+
+class UtxoSet(object):
+    """
+    UTXO 集合索引，以输出点为主键，并按地址建立二级索引。
+
+    二级索引中的字典保持插入顺序，即各地址的 UTXO 按上链顺序排列。
+    同时维护各地址余额：加入 UTXO 时记入，花费时扣除，查询余额为 O(1)。
+    """
+
+    def __init__(self) -> None:
+        self._coins = {}  # type: Dict[OutPoint, Coin]
+        self._by_address = {}  # type: Dict[str, Dict[OutPoint, Coin]]
+        self._balances = {}  # type: Dict[str, int]
+
+    def __len__(self) -> int:
+        return len(self._coins)
+
+    def __contains__(self, outpoint: OutPoint) -> bool:
+        return outpoint in self._coins
+
+    def get(self, outpoint: OutPoint) -> Optional[Coin]:
+        """
+        :param outpoint: 输出点
+        :return: 对应的 UTXO，已花费或不存在时为 None
+        """
+        return self._coins.get(outpoint)
+
+    def add(self, coin: Coin) -> None:
+        """
+        加入一个 UTXO。
+
+        :param coin: UTXO 记录
+        """
+        if coin.outpoint in self._coins:
+            self.spend(coin.outpoint)
+        self._coins[coin.outpoint] = coin
+        self._by_address.setdefault(coin.address, {})[coin.outpoint] = coin
+        self._balances[coin.address] = self._balances.get(coin.address, 0) + coin.value
+
+    def spend(self, outpoint: OutPoint) -> Optional[Coin]:
+        """
+        花费一个 UTXO，将其从索引中移除。重复花费不做任何事。
+
+        :param outpoint: 输出点
+        :return: 被花费的 UTXO，不存在时为 None
+        """
+        coin = self._coins.pop(outpoint, None)
+        if coin is not None:
+            owned = self._by_address[coin.address]
+            del owned[outpoint]
+            if not owned:
+                del self._by_address[coin.address]
+                del self._balances[coin.address]
+            else:
+                self._balances[coin.address] -= coin.value
+        return coin
+
+    def add_transaction(self, transaction: "Transaction", height: int) -> None:
+        """
+        将一条上链的交易应用到索引：花费其输入引用的 UTXO，加入其全部输出。
+
+        :param transaction: type=Transaction，交易
+        :param height: 交易所在区块在链中的下标
+        """
+        for each in transaction.inList:
+            self.spend(each.outpoint)
+        for each in transaction.outList:
+            self.add(Coin(transaction.hash, each.index, each.value, each.script, height))
+
+    def coins(self) -> Iterator[Coin]:
+        """
+        :return: 全部 UTXO
+        """
+        return iter(self._coins.values())
+
+    def unspent(self, address: str) -> List[Coin]:
+        """
+        :param address: 地址
+        :return: 该地址的全部 UTXO，按上链顺序排列
+        """
+        return list(self._by_address.get(address, {}).values())
+
+    def balance(self, address: str) -> int:
+        """
+        :param address: 地址
+        :return: 该地址的 UTXO 金额之和
+        """
+        return self._balances.get(address, 0)
+
+    def balances(self, addresses: List[str]) -> List[int]:
+        """
+        批量查询余额。
+
+        :param addresses: 地址列表
+        :return: 与 addresses 对应的余额
+        """
+        get = self._balances.get
+        return [get(each, 0) for each in addresses]
@@ -0,0 +1,210 @@
+# -*- coding:utf-8 -*-
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+from blockchain.codec import encode_block, decode_block
+from blockchain.merkle import MerkleTree
+from blockchain.mining import meets_target
+from blockchain.transaction import COINBASE_REWARD, verify_inputs
+from blockchain.utxo import Coin, OutPoint, UtxoSet
+
+# 创世区块的 preHash
+GENESIS_PRE_HASH = "0" * 64
+
+# 校验阶段名，作为进度回调的第一个参数
+STAGE_LINKS = "links"
+STAGE_UTXOS = "utxos"
+STAGE_HASHES = "hashes"
+STAGE_SIGNATURES = "signatures"
+
+# (区块下标, 问题描述)
+Issue = Tuple[int, str]
+# 进度回调：(阶段名, 已完成区块数, 区块总数)
+Progress = Callable[[str, int, int], None]
+
+
+def check_links(blocks: Sequence["Block"], progress: Optional[Progress] = None) -> List[Issue]:
+    """
+    第一阶段：顺序检查每个区块的 preHash 是否等于上个区块记录的 Block Hash。
+
+    :param blocks: 区块列表
+    :param progress: 进度回调
+    :return: 发现的问题
+    """
+    issues = []
+    pre = GENESIS_PRE_HASH
+    for height, block in enumerate(blocks):
+        if block.preHash != pre:
+            issues.append((height, "preHash 与上个区块的 Block Hash 不一致"))
+        pre = block.blockHash
+        if progress is not None:
+            progress(STAGE_LINKS, height + 1, len(blocks))
+    return issues
+
+
+def check_spends(tx: "Transaction", position: int, lookup: Callable[[OutPoint], Optional[Coin]]) -> List[str]:
+    """
+    检查一条交易花费的输出：每个输入引用的输出存在且未花费，preScript 与 utxo 等于该输出的锁定脚本与金额，
+    输入与输出金额相等。只有区块中的第 0 条交易是 coinbase，没有输入，金额为 COINBASE_REWARD。
+
+    输入的 preScript 与 utxo 不参与交易哈希，只有在这里与真正被花费的输出核对过，公匙与 preScript 的比较才有意义。
+
+    :param tx: type=Transaction，交易
+    :param position: 交易在区块中的下标
+    :param lookup: 按输出点查找未花费的输出，不存在或已花费时返回 None
+    :return: 发现的问题
+    """
+    name = "第 " + str(position) + " 条交易"
+    problems = []
+    if any(out.value <= 0 for out in tx.outList):
+        problems.append(name + "的输出金额必须为正数")
+    if not tx.inList:
+        if position != 0:
+            problems.append(name + "没有输入")
+        elif sum(out.value for out in tx.outList) != COINBASE_REWARD:
+            problems.append(name + "（coinbase）的金额不等于挖矿所得")
+        return problems
+    if position == 0:
+        problems.append(name + "应为没有输入的 coinbase")
+    total = 0
+    resolved = True
+    seen = set()
+    for j, each in enumerate(tx.inList):
+        coin = lookup(each.outpoint) if each.outpoint not in seen else None
+        seen.add(each.outpoint)
+        if coin is None:
+            problems.append(name + "的第 " + str(j) + " 个输入引用的输出不存在或已花费")
+            resolved = False
+            continue
+        if coin.address != each.preScript or coin.value != each.utxo:
+            problems.append(name + "的第 " + str(j) + " 个输入与引用的输出不一致")
+        total += coin.value
+    if resolved and total != sum(out.value for out in tx.outList):
+        problems.append(name + "的输入与输出金额不相等")
+    return problems
+
+
+def check_utxos(blocks: Sequence["Block"], progress: Optional[Progress] = None) -> List[Issue]:
+    """
+    第二阶段：按顺序重放整条链的 UTXO，用 check_spends 检查每条交易花费的输出。
+
+    :param blocks: 区块列表
+    :param progress: 进度回调
+    :return: 发现的问题
+    """
+    issues = []
+    utxo = UtxoSet()
+    for height, block in enumerate(blocks):
+        for i, tx in enumerate(block.data):
+            issues.extend((height, each) for each in check_spends(tx, i, utxo.get))
+            utxo.add_transaction(tx, height)
+        if progress is not None:
+            progress(STAGE_UTXOS, height + 1, len(blocks))
+    return issues
+
+
+def check_hashes(block: "Block", target: int) -> List[str]:
+    """
+    第三阶段：重新计算区块中各交易哈希、Merkle 根与 Block Hash，并检查工作量证明，不修改区块。
+
+    target 不参与区块头哈希，因此不能信任区块自己记录的 target，必须等于区块链难度对应的目标值。
+
+    :param block: type=Block，区块
+    :param target: 区块链难度对应的目标值
+    :return: 发现的问题
+    """
+    problems = []
+    digests = [tx.digest() for tx in block.data]
+    for i, (tx, digest) in enumerate(zip(block.data, digests)):
+        if digest != tx.hashBytes:
+            problems.append("第 " + str(i) + " 条交易的哈希与内容不符")
+    if MerkleTree([each.hex() for each in digests]).root != block.merkleHash:
+        problems.append("Merkle Hash 与交易不符")
+    if block.header_midstate().hexdigest_with(str(block.nonce).encode()) != block.blockHash:
+        problems.append("Block Hash 与区块头不符")
+    if block.target is None:
+        problems.append("区块没有工作量证明")
+    elif block.target != target:
+        problems.append("区块的目标值与区块链难度不符")
+    if not meets_target(block.blockHash, target):
+        problems.append("Block Hash 不满足目标值")
+    return problems
+
+
+def check_signatures(block: "Block") -> List[str]:
+    """
+    第四阶段：验证区块中所有交易输入的公匙对应引用输出的锁定地址，并验证签名。
+
+    :param block: type=Block，区块
+    :return: 发现的问题
+    """
+    positions = []
+    inputs = []
+    for i, tx in enumerate(block.data):
+        for j, each in enumerate(tx.inList):
+            positions.append((i, j))
+            inputs.append(each)
+    return ["第 " + str(i) + " 条交易的第 " + str(j) + " 个输入验证失败：公匙不对应锁定地址或签名无效"
+            for (i, j), ok in zip(positions, verify_inputs(inputs)) if not ok]
+
+
+def _check_hashes_encoded(payload: bytes, target: int) -> List[str]:
+    return check_hashes(decode_block(payload), target)
+
+
+def _check_signatures_encoded(payload: bytes) -> List[str]:
+    return check_signatures(decode_block(payload))
+
+
+def _run_stage(stage: str, results: Iterable[List[str]], total: int, progress: Optional[Progress]) -> List[Issue]:
+    issues = []
+    for height, problems in enumerate(results):
+        issues.extend((height, each) for each in problems)
+        if progress is not None:
+            progress(stage, height + 1, total)
+    return issues
+
+
+def validate_chain(blocks: Sequence["Block"], target: int, workers: int = 1, progress: Optional[Progress] = None,
+                   chunksize: int = 8) -> List[Issue]:
+    """
+    完整校验一条链，分四个阶段：
+
+        1. 顺序检查区块间的哈希链接，很快
+        2. 顺序重放 UTXO，检查每个输入花费的输出存在、未花费且与输入记录一致，金额守恒
+        3. 重新计算交易哈希、Merkle 根与 Block Hash，检查工作量证明
+        4. 验证全部输入的公匙与锁定地址、签名
+
+    后两个阶段各区块互不相关，workers 大于 1 时分发到多个进程：区块先用 blockchain.codec 编码，
+    在子进程中解码后校验。
+
+    :param blocks: 区块列表
+    :param target: 区块链难度对应的目标值，每个区块的哈希都不能超过它
+    :param workers: 进程数，1 表示在当前进程中校验
+    :param progress: 进度回调，参数为 (阶段名, 已完成区块数, 区块总数)
+    :param chunksize: 每次分发给子进程的区块数
+    :return: 发现的问题，按阶段与区块下标排列，空列表表示整条链有效
+    """
+    blocks = list(blocks)
+    total = len(blocks)
+    issues = check_links(blocks, progress)
+    logging.debug("区块链接校验完成，发现 " + str(len(issues)) + " 个问题。")
+    issues += check_utxos(blocks, progress)
+    logging.debug("UTXO 校验完成，累计发现 " + str(len(issues)) + " 个问题。")
+    if workers > 1:
+        payloads = [encode_block(each) for each in blocks]
+        with ProcessPoolExecutor(workers) as pool:
+            issues += _run_stage(STAGE_HASHES,
+                                 pool.map(_check_hashes_encoded, payloads, repeat(target), chunksize=chunksize),
+                                 total, progress)
+            logging.debug("哈希校验完成，累计发现 " + str(len(issues)) + " 个问题。")
+            issues += _run_stage(STAGE_SIGNATURES,
+                                 pool.map(_check_signatures_encoded, payloads, chunksize=chunksize),
+                                 total, progress)
+    else:
+        issues += _run_stage(STAGE_HASHES, map(check_hashes, blocks, repeat(target)), total, progress)
+        logging.debug("哈希校验完成，累计发现 " + str(len(issues)) + " 个问题。")
+        issues += _run_stage(STAGE_SIGNATURES, map(check_signatures, blocks), total, progress)
+    logging.debug("签名校验完成，累计发现 " + str(len(issues)) + " 个问题。")
+    return issues
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+命令行入口，不依赖 PyQt5，不生成演示用户。
+
+区块链保存在 --data 指定的目录中（默认 ccoin-data），每条命令结束时写入磁盘。
+
+用法（在仓库根目录）::
+
+    python -m ccoin create-user
+    python -m ccoin mine 地址
+    python -m ccoin send --wif 压缩私匙 --to 地址 --value 金额
+    python -m ccoin balance 地址 [地址 ...]
+    python -m ccoin info
+    python -m ccoin validate [--workers N]
+    python -m ccoin serve [--host H] [--port P] [--unix 路径]
+    python -m ccoin gui
+"""
+import argparse
+import logging
+import sys
+from typing import List, Optional
+
+DEFAULT_DATA = "ccoin-data"
+
+
+def positive_int(text: str) -> int:
+    """
+    argparse 的参数类型：正整数。
+    """
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError("不是整数：" + text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError("必须为正数：" + text)
+    return value
+
+
+def open_chain(args: argparse.Namespace) -> "Blockchain":
+    from blockchain.block import Blockchain
+    return Blockchain.open(args.data, difficulty=args.difficulty, workers=args.workers)
+
+
+def cmd_create_user(args: argparse.Namespace) -> int:
+    from blockchain.user import User
+    user = User(User.create_user())
+    print("wif:     " + user.wif)
+    print("address: " + user.address)
+    return 0
+
+
+def cmd_mine(args: argparse.Namespace) -> int:
+    from blockchain.block import Block
+    chain = open_chain(args)
+    try:
+        block = Block(args.address)
+        chain.add_block(block)
+        print("height:    " + str(block.height))
+        print("blockHash: " + block.blockHash)
+        if chain.last_mining_stats is not None:
+            print("mining:    " + repr(chain.last_mining_stats))
+    finally:
+        chain.close()
+    return 0
+
+
+def cmd_send(args: argparse.Namespace) -> int:
+    from blockchain import error
+    from blockchain.transaction import make_deal
+    from blockchain.user import User
+    chain = open_chain(args)
+    try:
+        if not len(chain.blockList):
+            print("区块链为空，请先挖矿。", file=sys.stderr)
+            return 1
+        try:
+            tx = make_deal(User(args.wif), args.to, args.value, chain, args.strategy)
+        except error.CoinNotEnough:
+            print("余额不足。", file=sys.stderr)
+            return 1
+        except error.BlockIsOverFlow:
+            print("最后一个区块已满，请先挖矿。", file=sys.stderr)
+            return 1
+        print("hash: " + tx.hash)
+    finally:
+        chain.close()
+    return 0
+
+
+def cmd_balance(args: argparse.Namespace) -> int:
+    chain = open_chain(args)
+    try:
+        for address, balance in zip(args.addresses, chain.balances(args.addresses)):
+            print(address + " " + str(balance))
+    finally:
+        chain.close()
+    return 0
+
+
+def cmd_info(args: argparse.Namespace) -> int:
+    chain = open_chain(args)
+    try:
+        print("blocks:     " + str(len(chain.blockList)))
+        print("utxos:      " + str(len(chain.utxo)))
+        print("difficulty: " + str(chain.difficulty))
+        if len(chain.blockList):
+            print("tip:        " + chain.blockList[-1].blockHash)
+    finally:
+        chain.close()
+    return 0
+
+
+def cmd_validate(args: argparse.Namespace) -> int:
+    chain = open_chain(args)
+    try:
+        def progress(stage: str, done: int, total: int) -> None:
+            if done == total:
+                print(stage + ": " + str(total) + " 个区块", file=sys.stderr)
+
+        issues = chain.validate(args.jobs, progress)
+    finally:
+        chain.close()
+    for height, problem in issues:
+        print(str(height) + " " + problem)
+    if issues:
+        return 1
+    print("ok")
+    return 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    from ccoin.service import run
+    run(open_chain(args), args.host, None if args.no_tcp else args.port, args.unix)
+    return 0
+
+
+def cmd_gui(args: argparse.Namespace) -> int:
+    try:
+        from PyQt5.QtWidgets import QApplication
+    except ImportError:
+        print("图形界面需要 PyQt5，请先安装。", file=sys.stderr)
+        return 1
+    from GUI.MainWidget import MainWindow
+    app = QApplication(sys.argv[:1])
+    window = MainWindow()
+    window.show()
+    return app.exec_()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from blockchain.coinselect import STRATEGIES
+    from ccoin.service import DEFAULT_HOST, DEFAULT_PORT
+    parser = argparse.ArgumentParser(prog="python -m ccoin", description="C-coin 命令行")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="区块链目录，默认 " + DEFAULT_DATA)
+    parser.add_argument("--difficulty", type=int, default=8, help="挖矿难度（前导 0 比特数），默认 8")
+    parser.add_argument("--workers", type=int, default=1, help="挖矿进程数，默认 1")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出调试日志")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    sub = commands.add_parser("create-user", help="创建用户，输出压缩私匙与地址")
+    sub.set_defaults(func=cmd_create_user)
+
+    sub = commands.add_parser("mine", help="挖一个新区块")
+    sub.add_argument("address", help="矿工地址")
+    sub.set_defaults(func=cmd_mine)
+
+    sub = commands.add_parser("send", help="转账，交易写入最后一个区块")
+    sub.add_argument("--wif", required=True, help="发起人的压缩私匙")
+    sub.add_argument("--to", required=True, help="接收人地址")
+    sub.add_argument("--value", type=positive_int, required=True, help="金额，正整数")
+    sub.add_argument("--strategy", default="auto", choices=sorted(STRATEGIES), help="选币策略，默认 auto")
+    sub.set_defaults(func=cmd_send)
+
+    sub = commands.add_parser("balance", help="查询余额")
+    sub.add_argument("addresses", nargs="+", help="地址")
+    sub.set_defaults(func=cmd_balance)
+
+    sub = commands.add_parser("info", help="区块链概况")
+    sub.set_defaults(func=cmd_info)
+
+    sub = commands.add_parser("validate", help="完整校验区块链")
+    sub.add_argument("--jobs", type=int, default=1, help="校验进程数，默认 1")
+    sub.set_defaults(func=cmd_validate)
+
+    sub = commands.add_parser("serve", help="启动节点服务")
+    sub.add_argument("--host", default=DEFAULT_HOST, help="监听地址，默认 " + DEFAULT_HOST)
+    sub.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP 端口，默认 " + str(DEFAULT_PORT))
+    sub.add_argument("--no-tcp", action="store_true", help="不监听 TCP 端口")
+    sub.add_argument("--unix", default=None, help="同时监听的 Unix socket 路径")
+    sub.set_defaults(func=cmd_serve)
+
+    sub = commands.add_parser("gui", help="启动图形界面（需要 PyQt5）")
+    sub.set_defaults(func=cmd_gui)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    :param argv: 命令行参数，默认取 sys.argv[1:]
+    :return: 退出码
+    """
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+    return args.func(args)
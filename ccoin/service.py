@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+无界面的节点服务：在本机 TCP 端口或 Unix socket 上以 asyncio 提供区块链操作。
+
+协议为每行一个 JSON 对象。请求为 {"id": 任意值, "method": 方法名, "params": {...}}，
+应答为 {"id": 同请求, "result": ...}，出错时为 {"id": 同请求, "error": {"type": 异常名, "message": 说明}}。
+
+方法：
+
+    status              区块数、内存池交易数与难度
+    get_balance         params: address 或 addresses
+    get_block           params: height（可为负数，-1 为最后一个区块）
+    submit_transaction  params: tx（blockchain.codec 编码的交易，十六进制），
+                        或 wif、to、value、strategy（由服务构建并签名）
+    mine                params: address，将内存池中的交易打包出块，内存池为空时只含 coinbase
+
+签名、验证与挖矿都在线程池中进行，事件循环只负责收发，不被这些计算阻塞。
+
+运行方式（在仓库根目录，给出目录时使用磁盘上的区块链，否则使用内存中的空链）::
+
+    python -m ccoin.service [区块链目录]
+"""
+import asyncio
+import json
+import logging
+import signal
+import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from blockchain import error
+from blockchain.block import Block, Blockchain
+from blockchain.codec import decode_transaction, encode_block_json
+from blockchain.mempool import Mempool
+from blockchain.transaction import make_deal
+from blockchain.user import User
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8333
+# 单行请求的最大字节数
+LINE_LIMIT = 1 << 20
+
+# 作为错误应答返回给客户端的异常，其他异常记录日志后以 InternalError 返回
+CLIENT_ERRORS = (error.CoinNotEnough, error.AccessDenied, error.BlockIsOverFlow, error.DoubleSpend,
+                 error.InvalidTransaction, ValueError, KeyError, IndexError, TypeError)
+
+
+class NodeService(object):
+    """
+    节点服务。一个服务对应一条区块链和一个内存池，可同时监听 TCP 与 Unix socket。
+    """
+
+    def __init__(self, blockchain: Blockchain, mempool: Optional[Mempool] = None,
+                 executor: Optional[Executor] = None) -> None:
+        """
+        :param blockchain: 区块链
+        :param mempool: 内存池，默认新建
+        :param executor: 执行计算的线程池，默认新建 4 个线程的线程池
+        """
+        self.blockchain = blockchain
+        self.mempool = mempool if mempool is not None else Mempool(blockchain)
+        self.executor = executor if executor is not None else ThreadPoolExecutor(4, thread_name_prefix="ccoin")
+        self.servers = []  # type: list
+        self.methods = {
+            "status": self.status,
+            "get_balance": self.get_balance,
+            "get_block": self.get_block,
+            "submit_transaction": self.submit_transaction,
+            "mine": self.mine,
+        }  # type: Dict[str, Callable[[Dict[str, Any]], Any]]
+
+    def status(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        with self.blockchain.lock.read():
+            blocks = len(self.blockchain.blockList)
+        return {"blocks": blocks, "mempool": len(self.mempool), "difficulty": self.blockchain.difficulty}
+
+    def get_balance(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if "addresses" in params:
+            return {"balances": self.blockchain.balances(list(params["addresses"]))}
+        address = params["address"]
+        return {"address": address, "balance": self.blockchain.balances([address])[0]}
+
+    def get_block(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        height = int(params["height"])
+        with self.blockchain.lock.read():
+            if height < 0:
+                height += len(self.blockchain.blockList)
+            if not 0 <= height < len(self.blockchain.blockList):
+                raise IndexError("区块下标越界")
+            block = json.loads(encode_block_json(self.blockchain.blockList[height]))
+        block["height"] = height
+        return block
+
+    def submit_transaction(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if "tx" in params:
+            data = bytes.fromhex(params["tx"])
+            tx, pos = decode_transaction(memoryview(data), 0)
+            if pos != len(data):
+                raise ValueError("交易编码末尾有多余数据")
+            # 哈希由内容重新计算，不信任编码中的哈希
+            tx.seal()
+            self.mempool.add(tx)
+        else:
+            tx = make_deal(User(params["wif"]), params["to"], int(params["value"]), self.blockchain,
+                           params.get("strategy", "auto"), mempool=self.mempool)
+        return {"hash": tx.hash}
+
+    def mine(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        address = params["address"]
+        block = self.mempool.assemble(address)
+        if block is None:
+            block = Block(address)
+            self.blockchain.add_block(block)
+        return {"height": block.height, "blockHash": block.blockHash, "transactions": len(block.data)}
+
+    async def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        处理一个请求，方法在线程池中执行。
+
+        :param request: 请求
+        :return: 应答
+        """
+        response = {"id": request.get("id")}
+        method = self.methods.get(request.get("method"))
+        if method is None:
+            response["error"] = {"type": "MethodNotFound", "message": "未知的方法：" + str(request.get("method"))}
+            return response
+        params = request.get("params") or {}
+        loop = asyncio.get_running_loop()
+        try:
+            response["result"] = await loop.run_in_executor(self.executor, method, params)
+        except CLIENT_ERRORS as e:
+            response["error"] = {"type": type(e).__name__, "message": str(e)}
+        except Exception as e:
+            logging.exception("处理请求出错：" + str(request.get("method")))
+            response["error"] = {"type": "InternalError", "message": str(e)}
+        return response
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        处理一个连接：逐行读取请求，同一连接上的请求依次应答。
+
+        请求行超过 LINE_LIMIT 时无法继续分行，回复一条错误应答后关闭连接。
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    response = {"id": None, "error": {"type": "RequestTooLarge",
+                                                      "message": "请求超过 " + str(LINE_LIMIT) + " 字节"}}
+                    writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("请求必须是 JSON 对象")
+                except ValueError as e:
+                    response = {"id": None, "error": {"type": "ParseError", "message": str(e)}}
+                else:
+                    response = await self.handle(request)
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start_tcp(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        """
+        开始监听本机 TCP 端口。
+
+        :param host: 监听地址
+        :param port: 端口，0 表示由系统分配
+        :return: asyncio 服务器
+        """
+        server = await asyncio.start_server(self._client, host, port, limit=LINE_LIMIT)
+        self.servers.append(server)
+        logging.info("节点服务已监听 " + ", ".join(str(each.getsockname()) for each in server.sockets))
+        return server
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        """
+        开始监听 Unix socket。
+
+        :param path: socket 文件路径
+        :return: asyncio 服务器
+        """
+        server = await asyncio.start_unix_server(self._client, path, limit=LINE_LIMIT)
+        self.servers.append(server)
+        logging.info("节点服务已监听 " + path)
+        return server
+
+    async def serve_forever(self) -> None:
+        """
+        持续服务，直到任务被取消。
+        """
+        try:
+            await asyncio.gather(*(each.serve_forever() for each in self.servers))
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """
+        关闭全部监听并等待执行中的请求完成。
+        """
+        for each in self.servers:
+            each.close()
+            await each.wait_closed()
+        self.servers = []
+        self.executor.shutdown(wait=True)
+
+
+async def call(method: str, params: Optional[Dict[str, Any]] = None, host: str = DEFAULT_HOST,
+               port: int = DEFAULT_PORT, path: Optional[str] = None) -> Any:
+    """
+    客户端：连接节点服务，发送一个请求并等待应答。
+
+    :param method: 方法名
+    :param params: 参数
+    :param host: 服务地址
+    :param port: 服务端口
+    :param path: Unix socket 路径，给出时忽略 host 与 port
+    :return: 应答中的 result
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path, limit=LINE_LIMIT)
+    else:
+        reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+    try:
+        writer.write(json.dumps({"id": 1, "method": method, "params": params or {}}).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+    finally:
+        writer.close()
+    if "error" in response:
+        raise RuntimeError(response["error"]["type"] + ": " + response["error"]["message"])
+    return response["result"]
+
+
+def run(blockchain: Blockchain, host: str = DEFAULT_HOST, port: Optional[int] = DEFAULT_PORT,
+        path: Optional[str] = None) -> None:
+    """
+    启动节点服务并一直运行，直到收到 SIGINT（Ctrl+C）或 SIGTERM，退出前将区块链写入磁盘。
+
+    :param blockchain: 区块链
+    :param host: 监听地址
+    :param port: TCP 端口，None 表示不监听 TCP
+    :param path: Unix socket 路径，None 表示不监听 Unix socket
+    """
+    async def main() -> None:
+        service = NodeService(blockchain)
+        if port is not None:
+            await service.start_tcp(host, port)
+        if path is not None:
+            await service.start_unix(path)
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        for each in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(each, task.cancel)
+            except (NotImplementedError, RuntimeError):
+                # Windows 不支持，Ctrl+C 仍以 KeyboardInterrupt 结束
+                pass
+        try:
+            await service.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        blockchain.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run(Blockchain.open(sys.argv[1]) if len(sys.argv) > 1 else Blockchain())
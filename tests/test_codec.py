@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+区块二进制编码与 JSON 编码的往返测试。
+"""
+import random
+
+import pytest
+
+from blockchain import error
+from blockchain.block import Block, Blockchain
+from blockchain.codec import decode_block, decode_block_json, encode_block, encode_block_json, read_varint, \
+    write_varint
+from blockchain.transaction import make_deal
+from blockchain.user import User
+
+CODECS = [(encode_block, decode_block), (encode_block_json, decode_block_json)]
+
+
+@pytest.fixture(scope="module")
+def chain():
+    """
+    生成测试用的区块链：难度为 0，包含挖矿交易、转账与找零。
+    """
+    rng = random.Random(2021)
+    people = [User(User.create_user()) for _ in range(3)]
+    chain = Blockchain(difficulty=0)
+    for each in people:
+        chain.add_block(Block(each.address))
+    for _ in range(12):
+        sender, receiver = rng.sample(people, 2)
+        try:
+            make_deal(sender, receiver.address, rng.randint(1, 40), chain)
+        except error.CoinNotEnough:
+            chain.add_block(Block(sender.address))
+        if len(chain.blockList[-1].data) >= 4:
+            chain.add_block(Block(sender.address))
+    yield chain
+    chain.close()
+
+
+def fields(block: Block) -> list:
+    """
+    区块中参与编码的全部字段。
+    """
+    return [block.timeStamp, block.preHash, block.merkleHash, block.blockHash, block.nonce, block.target,
+            [[tx.hash, tx.extra,
+              [[each.preHash, each.index, each.preScript, tuple(each.script[0]), tuple(each.script[1]), each.utxo]
+               for each in tx.inList],
+              [[each.value, each.index, each.script] for each in tx.outList]]
+             for tx in block.data]]
+
+
+@pytest.mark.parametrize("encode, decode", CODECS)
+def test_round_trip(chain, encode, decode):
+    assert any(len(tx.inList) > 0 for block in chain.blockList for tx in block.data)
+    for block in chain.blockList:
+        payload = encode(block)
+        again = decode(payload)
+        assert fields(again) == fields(block)
+        assert encode(again) == payload
+        assert again.meets_target()
+        assert not again.dirty
+
+
+def test_round_trip_unmined_block():
+    block = Block(User(User.create_user()).address)
+    assert block.target is None
+    again = decode_block(encode_block(block))
+    assert fields(again) == fields(block)
+
+
+def test_decode_rejects_bad_input(chain):
+    payload = encode_block(chain.blockList[-1])
+    with pytest.raises(ValueError):
+        decode_block(payload + b"\x00")
+    with pytest.raises(ValueError):
+        decode_block(bytes([payload[0] + 1]) + payload[1:])
+
+
+@pytest.mark.parametrize("n", [0, 1, 127, 128, 300, 16383, 16384, 2 ** 64, 2 ** 256 - 1])
+def test_varint_round_trip(n):
+    buf = bytearray()
+    write_varint(buf, n)
+    assert read_varint(memoryview(bytes(buf) + b"\xff"), 0) == (n, len(buf))
+
+
+def test_varint_rejects_negative():
+    with pytest.raises(ValueError):
+        write_varint(bytearray(), -1)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+选币策略测试：金额是否足够、分支定界与穷举结果对照，以及大量 UTXO 时不出错。
+"""
+import itertools
+import random
+
+import pytest
+
+from blockchain.coinselect import MAX_INPUTS, STRATEGIES, select_branch_and_bound, select_coins
+from blockchain.utxo import Coin
+
+
+def make_coins(values: list) -> list:
+    return [Coin(str(i), 0, value, "wallet", 0) for i, value in enumerate(values)]
+
+
+def exact_sum_exists(values: list, value: int) -> bool:
+    """
+    穷举所有组合，判断是否存在金额恰好为 value 的组合。
+    """
+    return any(sum(each) == value
+               for size in range(1, len(values) + 1)
+               for each in itertools.combinations(values, size))
+
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+def test_strategies_cover_value(strategy):
+    rng = random.Random(2021)
+    for _ in range(200):
+        coins = make_coins([rng.randint(1, 100) for _ in range(rng.randint(0, 12))])
+        value = rng.randint(1, 400)
+        chosen = select_coins(coins, value, strategy)
+        total = sum(each.value for each in coins)
+        if chosen is None:
+            assert strategy == "bnb" or total < value
+            continue
+        assert len(set(id(each) for each in chosen)) == len(chosen)
+        assert all(any(each is coin for coin in coins) for each in chosen)
+        assert sum(each.value for each in chosen) >= value
+        if strategy == "bnb":
+            assert sum(each.value for each in chosen) == value
+
+
+def test_branch_and_bound_matches_brute_force():
+    rng = random.Random(2021)
+    for _ in range(300):
+        values = [rng.randint(1, 30) for _ in range(rng.randint(1, 10))]
+        value = rng.randint(1, 120)
+        chosen = select_branch_and_bound(make_coins(values), value)
+        if exact_sum_exists(values, value):
+            assert chosen is not None and sum(each.value for each in chosen) == value, (values, value)
+        else:
+            assert chosen is None, (values, value)
+
+
+def test_branch_and_bound_many_coins():
+    coins = make_coins([2] * 2000)
+    chosen = select_branch_and_bound(coins, 2 * MAX_INPUTS)
+    assert chosen is not None and len(chosen) == MAX_INPUTS
+    assert select_branch_and_bound(coins, 2 * MAX_INPUTS + 1) is None
+    assert select_branch_and_bound(coins, 2 * MAX_INPUTS + 2) is None
+
+
+def test_branch_and_bound_non_positive_value():
+    coins = make_coins([1, 2, 3])
+    assert select_branch_and_bound(coins, 0) is None
+    assert select_branch_and_bound(coins, -1) is None
+
+
+def test_consolidate_limits_inputs():
+    coins = make_coins(list(range(1, 201)))
+    chosen = select_coins(coins, 1000, "consolidate")
+    assert len(chosen) == MAX_INPUTS
+    assert sum(each.value for each in chosen) >= 1000
+    assert select_coins(coins, sum(range(1, 201)) + 1, "consolidate") is None
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        select_coins(make_coins([1]), 1, "unknown")
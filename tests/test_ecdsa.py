@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+ECDSA 求逆后端、批量求逆、标量乘法边界与 verify_many 的测试。
+
+运行方式（在仓库根目录）::
+
+    python -m pytest tests
+"""
+import random
+
+import pytest
+
+from utils.ecdsa import ECDSA
+
+MODULI = [ECDSA.p, ECDSA.order]
+
+
+@pytest.mark.parametrize("md", MODULI)
+def test_inv_backends_agree(md):
+    """
+    随机性质测试：各求逆后端结果一致，且满足 x * inv(x) = 1。
+
+    覆盖 0、1、md - 1 与超过模数的输入。
+    """
+    rng = random.Random(2021)
+    cases = [0, 1, 2, md - 1, md, md + 1, 2 * md] + [rng.randrange(1, 1 << rng.choice((8, 64, 256, 512)))
+                                                    for _ in range(300)]
+    for x in cases:
+        expected = ECDSA.inv_fermat(x, md)
+        for name in ECDSA.INV_BACKENDS:
+            assert getattr(ECDSA, "inv_" + name)(x, md) == expected, (name, x)
+        if x % md == 0:
+            assert expected == 0
+        else:
+            assert x * expected % md == 1
+
+
+@pytest.mark.parametrize("md", MODULI)
+def test_quick_pow_matches_reference(md):
+    rng = random.Random(2021)
+    for _ in range(50):
+        x, k = rng.randrange(md), rng.randrange(md)
+        assert ECDSA.quick_pow(x, k, md) == ECDSA.quick_pow_reference(x, k, md)
+
+
+@pytest.mark.parametrize("name", ECDSA.INV_BACKENDS)
+def test_set_inv_backend(name):
+    backend = ECDSA.INV_BACKEND
+    try:
+        ECDSA.set_inv_backend(name)
+        assert ECDSA.inv(3) * 3 % ECDSA.p == 1
+    finally:
+        ECDSA.set_inv_backend(backend)
+
+
+def test_set_unknown_inv_backend():
+    with pytest.raises(ValueError):
+        ECDSA.set_inv_backend("unknown")
+
+
+@pytest.mark.parametrize("md", MODULI)
+def test_batch_inv(md):
+    rng = random.Random(2021)
+    nums = [rng.randrange(md) for _ in range(20)] + [0, md, 1, md - 1]
+    assert ECDSA.batch_inv(nums, md) == [ECDSA.inv(each, md) for each in nums]
+
+
+def test_batch_inv_empty():
+    assert ECDSA.batch_inv([]) == []
+    assert ECDSA.batch_inv([0, ECDSA.p]) == [0, 0]
+
+
+@pytest.mark.parametrize("k", [0, ECDSA.order, 2 * ECDSA.order])
+def test_multiple_of_order_is_infinity(k):
+    assert ECDSA.curve_mul(ECDSA.g, k) == ECDSA.INF
+    assert ECDSA.curve_mul_affine(ECDSA.g, k) == ECDSA.INF
+    assert ECDSA.mul_base(k) == ECDSA.INF
+    assert ECDSA.curve_mul_multi([(ECDSA.g, k)]) == ECDSA.INF
+
+
+def test_scalar_wraps_around_order():
+    k = random.Random(2021).randrange(1, ECDSA.order)
+    expected = ECDSA.curve_mul_affine(ECDSA.g, k)
+    assert ECDSA.curve_mul(ECDSA.g, k) == expected
+    assert ECDSA.mul_base(k) == expected
+    assert ECDSA.mul_base(k + ECDSA.order) == expected
+    assert ECDSA.curve_mul_multi([(ECDSA.g, k + ECDSA.order)]) == expected
+
+
+def test_point_at_infinity():
+    g = ECDSA.g
+    assert ECDSA.curve_add(ECDSA.INF, g) == g
+    assert ECDSA.curve_add(g, ECDSA.INF) == g
+    assert ECDSA.curve_add(g, (g[0], -g[1] % ECDSA.p)) == ECDSA.INF
+    assert ECDSA.curve_mul(ECDSA.INF, 5) == ECDSA.INF
+    assert ECDSA.curve_mul_multi([(ECDSA.INF, 5), (g, 0)]) == ECDSA.INF
+    assert ECDSA.from_jacobian(ECDSA.to_jacobian(ECDSA.INF)) == ECDSA.INF
+
+
+def test_verify_many_matches_verify_signature():
+    rng = random.Random(2021)
+    keys = [rng.randrange(1, ECDSA.order) for _ in range(3)]
+    items = []
+    for i in range(12):
+        key = keys[i % len(keys)]
+        message = "message " + str(i)
+        items.append((message, ECDSA.mul_base(key), ECDSA.gen_signature(message, key)))
+    message, key, sign = items[0]
+    items.append((message + "!", key, sign))
+    items.append((message, items[1][1], sign))
+    items.append((message, ECDSA.INF, sign))
+
+    expected = [ECDSA.verify_signature(*each) for each in items]
+    assert expected == [True] * 12 + [False] * 3
+    assert ECDSA.verify_many(items) == expected
+
+
+def test_verify_many_empty():
+    assert ECDSA.verify_many([]) == []
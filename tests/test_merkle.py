@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Merkle 树的增量追加与包含证明测试。
+"""
+import pytest
+
+from blockchain.merkle import MerkleTree, PROOF_LEFT, PROOF_LONE, PROOF_RIGHT, verify_merkle_proof
+from utils.sha256 import my_sha256
+
+
+def leaves(n: int) -> list:
+    return [my_sha256("tx " + str(i)) for i in range(n)]
+
+
+def test_empty_tree():
+    tree = MerkleTree([])
+    assert tree.root == ""
+    with pytest.raises(IndexError):
+        tree.proof(0)
+
+
+def test_single_leaf_is_root():
+    leaf = leaves(1)[0]
+    tree = MerkleTree([leaf])
+    assert tree.root == leaf
+    assert tree.proof(0) == []
+    assert verify_merkle_proof(leaf, [], tree.root)
+
+
+@pytest.mark.parametrize("n", range(1, 34))
+def test_append_matches_rebuild(n):
+    items = leaves(n)
+    tree = MerkleTree(items[:1])
+    for each in items[1:]:
+        tree.append(each)
+    rebuilt = MerkleTree(items)
+    assert tree.levels == rebuilt.levels
+    assert tree.root == rebuilt.root
+
+
+@pytest.mark.parametrize("n", range(1, 34))
+def test_every_proof_verifies(n):
+    items = leaves(n)
+    tree = MerkleTree(items)
+    for i, each in enumerate(items):
+        proof = tree.proof(i)
+        assert verify_merkle_proof(each, proof, tree.root)
+        assert not verify_merkle_proof(my_sha256("other"), proof, tree.root)
+
+
+def test_tampered_proof_fails():
+    items = leaves(7)
+    tree = MerkleTree(items)
+    proof = tree.proof(6)
+    assert proof[0] == (PROOF_LONE, "")
+    assert not verify_merkle_proof(items[6], [(PROOF_RIGHT, items[5])] + proof[1:], tree.root)
+
+    proof = tree.proof(2)
+    assert proof[0] == (PROOF_RIGHT, items[3])
+    swapped = [(PROOF_LEFT, items[3])] + proof[1:]
+    assert not verify_merkle_proof(items[2], swapped, tree.root)
+    assert not verify_merkle_proof(items[2], [("X", items[3])] + proof[1:], tree.root)
+    assert not verify_merkle_proof(items[2], proof[:-1], tree.root)
+
+
+def test_proof_index_out_of_range():
+    tree = MerkleTree(leaves(4))
+    with pytest.raises(IndexError):
+        tree.proof(4)
+    with pytest.raises(IndexError):
+        tree.proof(-1)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import OrderedDict
+from typing import Dict
+from .ecdsa import ECDSA
+
+
+class KeyMaterial(object):
+    """
+    由一个私匙导出的全部密钥信息：私匙、公匙、压缩公匙与地址。
+    """
+
+    def __init__(self, private_key: str) -> None:
+        """
+        由私匙导出公匙、压缩公匙与地址，需要一次标量乘法和若干次 sha256。
+
+        :param private_key: 64 位十六进制私匙
+        """
+        self.private_key = private_key
+        self.public_key = ECDSA.get_public_key_from_private_key(private_key)
+        self.compressed_public_key = ECDSA.get_compressed_public_key_from_public_key(self.public_key)
+        self.address = ECDSA.get_address_from_compressed_public_key(self.compressed_public_key)
+
+
+class KeyCache(object):
+    """
+    有容量上限的 LRU 密钥缓存，以私匙为键，缓存 KeyMaterial。
+
+    命中时不做任何椭圆曲线运算或哈希；hits 和 misses 记录命中与未命中次数。
+
+    可在多个线程中共用：对缓存的读写加锁，未命中时的密钥导出在锁外进行。
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        """
+        :param capacity: 最多缓存的私匙个数
+        """
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # type: OrderedDict[str, KeyMaterial]
+        self._lock = threading.Lock()
+
+    def from_private_key(self, private_key: str) -> KeyMaterial:
+        """
+        按私匙查询密钥信息，未命中时导出并缓存。
+
+        :param private_key: 十六进制私匙，可带 0x 前缀
+        :return: 密钥信息
+        """
+        if private_key[0:2] == "0x":
+            private_key = private_key[2:]
+        private_key = private_key.lower().rjust(64, '0')
+        with self._lock:
+            material = self._entries.get(private_key)
+            if material is not None:
+                self.hits += 1
+                self._entries.move_to_end(private_key)
+                return material
+            self.misses += 1
+        material = KeyMaterial(private_key)
+        with self._lock:
+            self._entries[private_key] = material
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return material
+
+    def put(self, material: KeyMaterial) -> None:
+        """
+        放入已经导出的密钥信息，例如在其他进程中导出的结果，之后按该私匙查询即命中。
+
+        :param material: 密钥信息
+        """
+        with self._lock:
+            self._entries[material.private_key] = material
+            self._entries.move_to_end(material.private_key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def from_wif(self, wif: str) -> KeyMaterial:
+        """
+        按压缩私匙 wif 查询密钥信息。
+
+        :param wif: 压缩私匙
+        :return: 密钥信息
+        """
+        return self.from_private_key(ECDSA.get_private_key_from_wif(wif))
+
+    def stats(self) -> Dict[str, int]:
+        """
+        :return: 缓存大小、容量、命中与未命中次数
+        """
+        return {"size": len(self._entries), "capacity": self.capacity, "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        """
+        清空缓存与计数。
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# 全局共享的密钥缓存
+key_cache = KeyCache()
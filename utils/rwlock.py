@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class RWLock(object):
+    """
+    读写锁：允许多个线程同时读，写时独占。
+
+    写优先：有线程等待写锁时，新的读请求需等待，避免写线程被持续的读请求饿死。
+    同一线程可重复获取读锁或写锁；持有写锁的线程可以直接获取读锁；
+    只持有读锁的线程不能再获取写锁（会造成死锁），此时抛出 RuntimeError。
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        # 持有读锁的线程数、持有写锁的线程与重入次数、等待写锁的线程数
+        self._readers = 0
+        self._writer = None  # type: Optional[int]
+        self._write_depth = 0
+        self._writers_waiting = 0
+        # 当前线程的读锁重入次数
+        self._local = threading.local()
+
+    def acquire_read(self) -> None:
+        depth = getattr(self._local, "depth", 0)
+        if depth or self._writer == threading.get_ident():
+            self._local.depth = depth + 1
+            return
+        with self._cond:
+            while self._writer is not None or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        self._local.depth = 1
+        self._local.shared = True
+
+    def release_read(self) -> None:
+        depth = self._local.depth - 1
+        self._local.depth = depth
+        if depth or not getattr(self._local, "shared", False):
+            return
+        self._local.shared = False
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        if self._writer == me:
+            self._write_depth += 1
+            return
+        if getattr(self._local, "depth", 0):
+            raise RuntimeError("持有读锁的线程不能再获取写锁")
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer is not None or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        if self._writer != threading.get_ident():
+            raise RuntimeError("当前线程没有持有写锁")
+        self._write_depth -= 1
+        if self._write_depth:
+            return
+        with self._cond:
+            self._writer = None
+            self._cond.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """
+        with lock.read(): 期间持有读锁。
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """
+        with lock.write(): 期间持有写锁。
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 import struct
+from typing import Tuple
 
 MOD = 0xFFFFFFFF
 
 # 寄存器初始值
-H = H0 = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0]
+H0 = (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0)
 
 # 加法常量 K (4)
 K = [0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xCA62C1D6]
@@ -21,14 +22,16 @@ def left_rotate(data: int, k: int) -> int:
     return ((data << k) | (data >> (32 - k))) & MOD
 
 
-def my_sha1_hash(input_data: bytes) -> None:
+def my_sha1_hash(H: Tuple[int, ...], input_data: bytes) -> Tuple[int, ...]:
     """
     sha1 内部函数，对分组后的一组消息进行处理，长度 64 字节。
 
+    寄存器值通过参数传入、返回值传出，不使用全局变量，可在多个线程中同时使用。
+
+    :param H: 当前的 5 个寄存器值
     :param input_data: 输入的字节流，长度 64 字节
+    :return: 处理后的 5 个寄存器值
     """
-    global H
-
     # 创建信息集合 w，0-15 为初始值，后面 64 位为 0，之后进行操作。
     w = list(struct.unpack(">" + "I" * 16, input_data)) + ([0] * 64)
     for i in range(16, 80):
@@ -53,8 +56,8 @@ def my_sha1_hash(input_data: bytes) -> None:
             k = K[3]
         a, b, c, d, e = (e + f + left_rotate(a, 5) + w[i] + k) & MOD, a, left_rotate(b, 30), c, d
 
-    # 更改目前哈希值
-    H = (H[0] + a) & MOD, (H[1] + b) & MOD, \
+    # 返回新的哈希值
+    return (H[0] + a) & MOD, (H[1] + b) & MOD, \
         (H[2] + c) & MOD, (H[3] + d) & MOD, \
         (H[4] + e) & MOD
 
@@ -77,14 +80,13 @@ def my_sha1(input_str: str) -> str:
     data += data_len
 
     # MD 缓冲区初始化
-    global H
     H = H0
 
     # 处理消息
     # data 以 8 个字符为一个单位，每次处理 data[p:p+63]
     p = 0
     while p < len(data):
-        my_sha1_hash(data[p: p + 64])
+        H = my_sha1_hash(H, data[p: p + 64])
         p += 64
 
     # 最终 H 连接即为答案
@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
 import struct
+from typing import Tuple
 
 MOD = 0xFFFFFFFF
 
 # 寄存器初始值
-H = H0 = [0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
-          0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19]
+H0 = (0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
+      0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19)
 
 # 加法常量 K (64)
 K = [0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5,
@@ -37,14 +38,16 @@ def right_rotate(data: int, k: int) -> int:
     return ((data >> k) | (data << (32 - k))) & MOD
 
 
-def my_sha256_hash(input_data: bytes) -> None:
+def my_sha256_hash_reference(H: Tuple[int, ...], input_data: bytes) -> Tuple[int, ...]:
     """
     sha256 内部函数，对分组后的一组消息进行处理，长度 64 字节。
 
+    逐步调用 right_rotate 的直观实现，保留作为参考和性能对比，实际使用 my_sha256_hash。
+
+    :param H: 当前的 8 个寄存器值
     :param input_data: 输入的字节流，长度 64 字节
+    :return: 处理后的 8 个寄存器值
     """
-    global H
-
     # 创建信息集合 w，0-15 为初始值，后面 48 位为0，之后进行操作。
     w = list(struct.unpack(">" + "I" * 16, input_data)) + ([0] * 48)
     for i in range(16, 64):
@@ -77,12 +80,259 @@ def my_sha256_hash(input_data: bytes) -> None:
         a = (tmp1 + tmp2) & MOD
 
     # 更改目前哈希值
-    H = (H[0] + a) & MOD, (H[1] + b) & MOD, \
+    return (H[0] + a) & MOD, (H[1] + b) & MOD, \
         (H[2] + c) & MOD, (H[3] + d) & MOD, \
         (H[4] + e) & MOD, (H[5] + f) & MOD, \
         (H[6] + g) & MOD, (H[7] + h) & MOD
 
 
+# 预编译的分组解析格式
+_BLOCK = struct.Struct(">16I")
+
+
+def my_sha256_hash(H: Tuple[int, ...], input_data: bytes, K: Tuple[int, ...] = tuple(K),
+                   unpack=_BLOCK.unpack) -> Tuple[int, ...]:
+    """
+    sha256 内部函数，对分组后的一组消息进行处理，长度 64 字节。
+
+    与 my_sha256_hash_reference 结果相同，为纯 Python 下的速度做了以下调整：
+    循环移位全部内联；消息扩展完全展开为局部变量；K 与解析函数通过默认参数绑定为局部变量；
+    工作变量用一次元组赋值轮换。移位产生的高位只在求和后统一截断，结果不受影响。
+
+    :param H: 当前的 8 个寄存器值
+    :param input_data: 输入的字节流，长度 64 字节
+    :return: 处理后的 8 个寄存器值
+    """
+    w0, w1, w2, w3, w4, w5, w6, w7, w8, w9, w10, w11, w12, w13, w14, w15 = unpack(input_data)
+    w16 = (w0 + ((w1 >> 7 | w1 << 25) ^ (w1 >> 18 | w1 << 14) ^ (w1 >> 3)) + w9 +
+           ((w14 >> 17 | w14 << 15) ^ (w14 >> 19 | w14 << 13) ^ (w14 >> 10))) & MOD
+    w17 = (w1 + ((w2 >> 7 | w2 << 25) ^ (w2 >> 18 | w2 << 14) ^ (w2 >> 3)) + w10 +
+           ((w15 >> 17 | w15 << 15) ^ (w15 >> 19 | w15 << 13) ^ (w15 >> 10))) & MOD
+    w18 = (w2 + ((w3 >> 7 | w3 << 25) ^ (w3 >> 18 | w3 << 14) ^ (w3 >> 3)) + w11 +
+           ((w16 >> 17 | w16 << 15) ^ (w16 >> 19 | w16 << 13) ^ (w16 >> 10))) & MOD
+    w19 = (w3 + ((w4 >> 7 | w4 << 25) ^ (w4 >> 18 | w4 << 14) ^ (w4 >> 3)) + w12 +
+           ((w17 >> 17 | w17 << 15) ^ (w17 >> 19 | w17 << 13) ^ (w17 >> 10))) & MOD
+    w20 = (w4 + ((w5 >> 7 | w5 << 25) ^ (w5 >> 18 | w5 << 14) ^ (w5 >> 3)) + w13 +
+           ((w18 >> 17 | w18 << 15) ^ (w18 >> 19 | w18 << 13) ^ (w18 >> 10))) & MOD
+    w21 = (w5 + ((w6 >> 7 | w6 << 25) ^ (w6 >> 18 | w6 << 14) ^ (w6 >> 3)) + w14 +
+           ((w19 >> 17 | w19 << 15) ^ (w19 >> 19 | w19 << 13) ^ (w19 >> 10))) & MOD
+    w22 = (w6 + ((w7 >> 7 | w7 << 25) ^ (w7 >> 18 | w7 << 14) ^ (w7 >> 3)) + w15 +
+           ((w20 >> 17 | w20 << 15) ^ (w20 >> 19 | w20 << 13) ^ (w20 >> 10))) & MOD
+    w23 = (w7 + ((w8 >> 7 | w8 << 25) ^ (w8 >> 18 | w8 << 14) ^ (w8 >> 3)) + w16 +
+           ((w21 >> 17 | w21 << 15) ^ (w21 >> 19 | w21 << 13) ^ (w21 >> 10))) & MOD
+    w24 = (w8 + ((w9 >> 7 | w9 << 25) ^ (w9 >> 18 | w9 << 14) ^ (w9 >> 3)) + w17 +
+           ((w22 >> 17 | w22 << 15) ^ (w22 >> 19 | w22 << 13) ^ (w22 >> 10))) & MOD
+    w25 = (w9 + ((w10 >> 7 | w10 << 25) ^ (w10 >> 18 | w10 << 14) ^ (w10 >> 3)) + w18 +
+           ((w23 >> 17 | w23 << 15) ^ (w23 >> 19 | w23 << 13) ^ (w23 >> 10))) & MOD
+    w26 = (w10 + ((w11 >> 7 | w11 << 25) ^ (w11 >> 18 | w11 << 14) ^ (w11 >> 3)) + w19 +
+           ((w24 >> 17 | w24 << 15) ^ (w24 >> 19 | w24 << 13) ^ (w24 >> 10))) & MOD
+    w27 = (w11 + ((w12 >> 7 | w12 << 25) ^ (w12 >> 18 | w12 << 14) ^ (w12 >> 3)) + w20 +
+           ((w25 >> 17 | w25 << 15) ^ (w25 >> 19 | w25 << 13) ^ (w25 >> 10))) & MOD
+    w28 = (w12 + ((w13 >> 7 | w13 << 25) ^ (w13 >> 18 | w13 << 14) ^ (w13 >> 3)) + w21 +
+           ((w26 >> 17 | w26 << 15) ^ (w26 >> 19 | w26 << 13) ^ (w26 >> 10))) & MOD
+    w29 = (w13 + ((w14 >> 7 | w14 << 25) ^ (w14 >> 18 | w14 << 14) ^ (w14 >> 3)) + w22 +
+           ((w27 >> 17 | w27 << 15) ^ (w27 >> 19 | w27 << 13) ^ (w27 >> 10))) & MOD
+    w30 = (w14 + ((w15 >> 7 | w15 << 25) ^ (w15 >> 18 | w15 << 14) ^ (w15 >> 3)) + w23 +
+           ((w28 >> 17 | w28 << 15) ^ (w28 >> 19 | w28 << 13) ^ (w28 >> 10))) & MOD
+    w31 = (w15 + ((w16 >> 7 | w16 << 25) ^ (w16 >> 18 | w16 << 14) ^ (w16 >> 3)) + w24 +
+           ((w29 >> 17 | w29 << 15) ^ (w29 >> 19 | w29 << 13) ^ (w29 >> 10))) & MOD
+    w32 = (w16 + ((w17 >> 7 | w17 << 25) ^ (w17 >> 18 | w17 << 14) ^ (w17 >> 3)) + w25 +
+           ((w30 >> 17 | w30 << 15) ^ (w30 >> 19 | w30 << 13) ^ (w30 >> 10))) & MOD
+    w33 = (w17 + ((w18 >> 7 | w18 << 25) ^ (w18 >> 18 | w18 << 14) ^ (w18 >> 3)) + w26 +
+           ((w31 >> 17 | w31 << 15) ^ (w31 >> 19 | w31 << 13) ^ (w31 >> 10))) & MOD
+    w34 = (w18 + ((w19 >> 7 | w19 << 25) ^ (w19 >> 18 | w19 << 14) ^ (w19 >> 3)) + w27 +
+           ((w32 >> 17 | w32 << 15) ^ (w32 >> 19 | w32 << 13) ^ (w32 >> 10))) & MOD
+    w35 = (w19 + ((w20 >> 7 | w20 << 25) ^ (w20 >> 18 | w20 << 14) ^ (w20 >> 3)) + w28 +
+           ((w33 >> 17 | w33 << 15) ^ (w33 >> 19 | w33 << 13) ^ (w33 >> 10))) & MOD
+    w36 = (w20 + ((w21 >> 7 | w21 << 25) ^ (w21 >> 18 | w21 << 14) ^ (w21 >> 3)) + w29 +
+           ((w34 >> 17 | w34 << 15) ^ (w34 >> 19 | w34 << 13) ^ (w34 >> 10))) & MOD
+    w37 = (w21 + ((w22 >> 7 | w22 << 25) ^ (w22 >> 18 | w22 << 14) ^ (w22 >> 3)) + w30 +
+           ((w35 >> 17 | w35 << 15) ^ (w35 >> 19 | w35 << 13) ^ (w35 >> 10))) & MOD
+    w38 = (w22 + ((w23 >> 7 | w23 << 25) ^ (w23 >> 18 | w23 << 14) ^ (w23 >> 3)) + w31 +
+           ((w36 >> 17 | w36 << 15) ^ (w36 >> 19 | w36 << 13) ^ (w36 >> 10))) & MOD
+    w39 = (w23 + ((w24 >> 7 | w24 << 25) ^ (w24 >> 18 | w24 << 14) ^ (w24 >> 3)) + w32 +
+           ((w37 >> 17 | w37 << 15) ^ (w37 >> 19 | w37 << 13) ^ (w37 >> 10))) & MOD
+    w40 = (w24 + ((w25 >> 7 | w25 << 25) ^ (w25 >> 18 | w25 << 14) ^ (w25 >> 3)) + w33 +
+           ((w38 >> 17 | w38 << 15) ^ (w38 >> 19 | w38 << 13) ^ (w38 >> 10))) & MOD
+    w41 = (w25 + ((w26 >> 7 | w26 << 25) ^ (w26 >> 18 | w26 << 14) ^ (w26 >> 3)) + w34 +
+           ((w39 >> 17 | w39 << 15) ^ (w39 >> 19 | w39 << 13) ^ (w39 >> 10))) & MOD
+    w42 = (w26 + ((w27 >> 7 | w27 << 25) ^ (w27 >> 18 | w27 << 14) ^ (w27 >> 3)) + w35 +
+           ((w40 >> 17 | w40 << 15) ^ (w40 >> 19 | w40 << 13) ^ (w40 >> 10))) & MOD
+    w43 = (w27 + ((w28 >> 7 | w28 << 25) ^ (w28 >> 18 | w28 << 14) ^ (w28 >> 3)) + w36 +
+           ((w41 >> 17 | w41 << 15) ^ (w41 >> 19 | w41 << 13) ^ (w41 >> 10))) & MOD
+    w44 = (w28 + ((w29 >> 7 | w29 << 25) ^ (w29 >> 18 | w29 << 14) ^ (w29 >> 3)) + w37 +
+           ((w42 >> 17 | w42 << 15) ^ (w42 >> 19 | w42 << 13) ^ (w42 >> 10))) & MOD
+    w45 = (w29 + ((w30 >> 7 | w30 << 25) ^ (w30 >> 18 | w30 << 14) ^ (w30 >> 3)) + w38 +
+           ((w43 >> 17 | w43 << 15) ^ (w43 >> 19 | w43 << 13) ^ (w43 >> 10))) & MOD
+    w46 = (w30 + ((w31 >> 7 | w31 << 25) ^ (w31 >> 18 | w31 << 14) ^ (w31 >> 3)) + w39 +
+           ((w44 >> 17 | w44 << 15) ^ (w44 >> 19 | w44 << 13) ^ (w44 >> 10))) & MOD
+    w47 = (w31 + ((w32 >> 7 | w32 << 25) ^ (w32 >> 18 | w32 << 14) ^ (w32 >> 3)) + w40 +
+           ((w45 >> 17 | w45 << 15) ^ (w45 >> 19 | w45 << 13) ^ (w45 >> 10))) & MOD
+    w48 = (w32 + ((w33 >> 7 | w33 << 25) ^ (w33 >> 18 | w33 << 14) ^ (w33 >> 3)) + w41 +
+           ((w46 >> 17 | w46 << 15) ^ (w46 >> 19 | w46 << 13) ^ (w46 >> 10))) & MOD
+    w49 = (w33 + ((w34 >> 7 | w34 << 25) ^ (w34 >> 18 | w34 << 14) ^ (w34 >> 3)) + w42 +
+           ((w47 >> 17 | w47 << 15) ^ (w47 >> 19 | w47 << 13) ^ (w47 >> 10))) & MOD
+    w50 = (w34 + ((w35 >> 7 | w35 << 25) ^ (w35 >> 18 | w35 << 14) ^ (w35 >> 3)) + w43 +
+           ((w48 >> 17 | w48 << 15) ^ (w48 >> 19 | w48 << 13) ^ (w48 >> 10))) & MOD
+    w51 = (w35 + ((w36 >> 7 | w36 << 25) ^ (w36 >> 18 | w36 << 14) ^ (w36 >> 3)) + w44 +
+           ((w49 >> 17 | w49 << 15) ^ (w49 >> 19 | w49 << 13) ^ (w49 >> 10))) & MOD
+    w52 = (w36 + ((w37 >> 7 | w37 << 25) ^ (w37 >> 18 | w37 << 14) ^ (w37 >> 3)) + w45 +
+           ((w50 >> 17 | w50 << 15) ^ (w50 >> 19 | w50 << 13) ^ (w50 >> 10))) & MOD
+    w53 = (w37 + ((w38 >> 7 | w38 << 25) ^ (w38 >> 18 | w38 << 14) ^ (w38 >> 3)) + w46 +
+           ((w51 >> 17 | w51 << 15) ^ (w51 >> 19 | w51 << 13) ^ (w51 >> 10))) & MOD
+    w54 = (w38 + ((w39 >> 7 | w39 << 25) ^ (w39 >> 18 | w39 << 14) ^ (w39 >> 3)) + w47 +
+           ((w52 >> 17 | w52 << 15) ^ (w52 >> 19 | w52 << 13) ^ (w52 >> 10))) & MOD
+    w55 = (w39 + ((w40 >> 7 | w40 << 25) ^ (w40 >> 18 | w40 << 14) ^ (w40 >> 3)) + w48 +
+           ((w53 >> 17 | w53 << 15) ^ (w53 >> 19 | w53 << 13) ^ (w53 >> 10))) & MOD
+    w56 = (w40 + ((w41 >> 7 | w41 << 25) ^ (w41 >> 18 | w41 << 14) ^ (w41 >> 3)) + w49 +
+           ((w54 >> 17 | w54 << 15) ^ (w54 >> 19 | w54 << 13) ^ (w54 >> 10))) & MOD
+    w57 = (w41 + ((w42 >> 7 | w42 << 25) ^ (w42 >> 18 | w42 << 14) ^ (w42 >> 3)) + w50 +
+           ((w55 >> 17 | w55 << 15) ^ (w55 >> 19 | w55 << 13) ^ (w55 >> 10))) & MOD
+    w58 = (w42 + ((w43 >> 7 | w43 << 25) ^ (w43 >> 18 | w43 << 14) ^ (w43 >> 3)) + w51 +
+           ((w56 >> 17 | w56 << 15) ^ (w56 >> 19 | w56 << 13) ^ (w56 >> 10))) & MOD
+    w59 = (w43 + ((w44 >> 7 | w44 << 25) ^ (w44 >> 18 | w44 << 14) ^ (w44 >> 3)) + w52 +
+           ((w57 >> 17 | w57 << 15) ^ (w57 >> 19 | w57 << 13) ^ (w57 >> 10))) & MOD
+    w60 = (w44 + ((w45 >> 7 | w45 << 25) ^ (w45 >> 18 | w45 << 14) ^ (w45 >> 3)) + w53 +
+           ((w58 >> 17 | w58 << 15) ^ (w58 >> 19 | w58 << 13) ^ (w58 >> 10))) & MOD
+    w61 = (w45 + ((w46 >> 7 | w46 << 25) ^ (w46 >> 18 | w46 << 14) ^ (w46 >> 3)) + w54 +
+           ((w59 >> 17 | w59 << 15) ^ (w59 >> 19 | w59 << 13) ^ (w59 >> 10))) & MOD
+    w62 = (w46 + ((w47 >> 7 | w47 << 25) ^ (w47 >> 18 | w47 << 14) ^ (w47 >> 3)) + w55 +
+           ((w60 >> 17 | w60 << 15) ^ (w60 >> 19 | w60 << 13) ^ (w60 >> 10))) & MOD
+    w63 = (w47 + ((w48 >> 7 | w48 << 25) ^ (w48 >> 18 | w48 << 14) ^ (w48 >> 3)) + w56 +
+           ((w61 >> 17 | w61 << 15) ^ (w61 >> 19 | w61 << 13) ^ (w61 >> 10))) & MOD
+
+    a, b, c, d, e, f, g, h = H
+    for k, x in zip(K, (w0, w1, w2, w3, w4, w5, w6, w7, w8, w9, w10, w11, w12, w13, w14, w15,
+                        w16, w17, w18, w19, w20, w21, w22, w23, w24, w25, w26, w27, w28, w29, w30, w31,
+                        w32, w33, w34, w35, w36, w37, w38, w39, w40, w41, w42, w43, w44, w45, w46, w47,
+                        w48, w49, w50, w51, w52, w53, w54, w55, w56, w57, w58, w59, w60, w61, w62, w63)):
+        t1 = h + ((e >> 6 | e << 26) ^ (e >> 11 | e << 21) ^ (e >> 25 | e << 7)) + ((e & f) ^ (~e & g)) + k + x
+        t2 = ((a >> 2 | a << 30) ^ (a >> 13 | a << 19) ^ (a >> 22 | a << 10)) + ((a & b) | (c & (a | b)))
+        a, b, c, d, e, f, g, h = (t1 + t2) & MOD, a, b, c, (d + t1) & MOD, e, f, g
+
+    return (H[0] + a) & MOD, (H[1] + b) & MOD, (H[2] + c) & MOD, (H[3] + d) & MOD, \
+        (H[4] + e) & MOD, (H[5] + f) & MOD, (H[6] + g) & MOD, (H[7] + h) & MOD
+
+
+class Sha256(object):
+    """
+    流式 sha256 对象，接口与 hashlib 一致。
+
+    状态全部保存在对象内，不同对象之间互不影响，可以在多个线程中同时使用。
+    """
+    block_size = 64
+    digest_size = 32
+
+    def __init__(self, data: bytes = b'') -> None:
+        """
+        :param data: 初始数据，等价于创建后立刻 update
+        """
+        self._state = H0
+        self._buffer = b''
+        self._length = 0
+        if data:
+            self.update(data)
+
+    def update(self, data: bytes) -> None:
+        """
+        追加数据，凑满 64 字节的分组立刻处理，剩余部分暂存。
+
+        :param data: 追加的字节流
+        """
+        self._length += len(data)
+        state = self._state
+        view = memoryview(data)
+        p = 0
+        if self._buffer:
+            p = 64 - len(self._buffer)
+            if len(view) < p:
+                self._buffer += bytes(view)
+                return
+            state = my_sha256_hash(state, self._buffer + bytes(view[:p]))
+        end = len(view) - (len(view) - p) % 64
+        while p < end:
+            state = my_sha256_hash(state, view[p: p + 64])
+            p += 64
+        self._state = state
+        self._buffer = bytes(view[p:])
+
+    def copy(self) -> "Sha256":
+        """
+        复制当前状态，之后两者互不影响。
+
+        :return: 新的 Sha256 对象
+        """
+        other = Sha256()
+        other._state = self._state
+        other._buffer = self._buffer
+        other._length = self._length
+        return other
+
+    def finish(self, bit_len: int) -> Tuple[int, ...]:
+        """
+        以给定的消息长度填充并处理最后的分组，不改变对象自身的状态。
+
+        :param bit_len: 写入填充中的消息长度（比特）
+        :return: 最终的 8 个寄存器值
+        """
+        # 添加 10 序列
+        data = self._buffer + b'\x80'
+        data += b'\x00' * ((56 - len(data) % 64 + 64) % 64)
+        # 添加消息长度
+        data += struct.pack('>Q', bit_len)
+        state = self._state
+        for p in range(0, len(data), 64):
+            state = my_sha256_hash(state, data[p: p + 64])
+        return state
+
+    def digest_with(self, suffix: bytes) -> bytes:
+        """
+        把当前状态当作前缀的中间状态（midstate），返回追加 suffix 后的哈希值，不改变自身。
+
+        前缀中完整的分组只在建立 midstate 时处理一次，每次调用只需处理剩余部分和 suffix，
+        通常只有最后一两个分组。
+
+        :param suffix: 追加的字节流
+        :return: 32 字节的哈希值
+        """
+        other = self.copy()
+        other.update(suffix)
+        return other.digest()
+
+    def hexdigest_with(self, suffix: bytes) -> str:
+        """
+        同 digest_with，返回十六进制字符串。
+
+        :param suffix: 追加的字节流
+        :return: 长度为 64 的十六进制字符串
+        """
+        other = self.copy()
+        other.update(suffix)
+        return other.hexdigest()
+
+    def digest(self) -> bytes:
+        """
+        :return: 32 字节的哈希值
+        """
+        return struct.pack('>8I', *self.finish(self._length * 8))
+
+    def hexdigest(self) -> str:
+        """
+        :return: 长度为 64 的十六进制字符串
+        """
+        return "{:08x}{:08x}{:08x}{:08x}{:08x}{:08x}{:08x}{:08x}".format(*self.finish(self._length * 8))
+
+
+def sha256_midstate(prefix: bytes) -> Sha256:
+    """
+    计算固定前缀的 midstate，之后可以用 digest_with / hexdigest_with 对不同后缀快速求哈希。
+
+    :param prefix: 固定前缀
+    :return: 处理完前缀的 Sha256 对象
+    """
+    return Sha256(prefix)
+
+
 def my_sha256(input_str: str, is_number: bool = False, is_hex: bool = False) -> str:
     """
     对输入字符串进行 sha256
@@ -103,7 +353,7 @@ def my_sha256(input_str: str, is_number: bool = False, is_hex: bool = False) ->
         if len(num_str) < original_len:
             num_str = "0" * (original_len - len(num_str)) + num_str
 
-        data_len = struct.pack('>Q', len(num_str) * 4)
+        data_len = len(num_str) * 4
         data = b''
         for i in range(0, len(num_str), 2):
             num = (int(num_str[i], 16) << 4)
@@ -113,29 +363,9 @@ def my_sha256(input_str: str, is_number: bool = False, is_hex: bool = False) ->
     else:
         # 消息填充
         # len() 返回的是字符数（英文 8 比特，1 字节），所有方法都应是 8 倍
-        data_len = struct.pack('>Q', len(input_str) * 8)
+        data_len = len(input_str) * 8
         data = input_str.encode()
 
-    # 添加 10 序列
-    data += b'\x80'
-    data += b'\x00' * ((56 - len(data) % 64 + 64) % 64)
-    # 添加消息长度
-    data += data_len
-
-    # MD 缓冲区初始化
-    global H
-    H = H0
-
-    # 处理消息
-    # data 以 8 个字符为一个单位，每次处理 data[p:p+63]
-    p = 0
-    while p < len(data):
-        my_sha256_hash(data[p: p + 64])
-        p += 64
-
-    # 最终 H 连接即为答案
-    # print(result)
-    return "{:08x}".format(H[0]) + "{:08x}".format(H[1]) + \
-           "{:08x}".format(H[2]) + "{:08x}".format(H[3]) + \
-           "{:08x}".format(H[4]) + "{:08x}".format(H[5]) + \
-           "{:08x}".format(H[6]) + "{:08x}".format(H[7])
+    # 注意：消息长度由输入字符串决定，与 data 的字节数不一定一致（例如奇数位十六进制串），
+    # 这里保持原有的计算方式
+    return "{:08x}{:08x}{:08x}{:08x}{:08x}{:08x}{:08x}{:08x}".format(*Sha256(data).finish(data_len))